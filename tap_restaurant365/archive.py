@@ -0,0 +1,95 @@
+"""Raw page archive for replaying Restaurant365 syncs without the API."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import threading
+import zlib
+from typing import Iterator
+
+
+def default_codec() -> str:
+    """Return "zstd" if the zstandard package is installed, else "zlib"."""
+    try:
+        import zstandard  # noqa: F401
+    except ImportError:
+        return "zlib"
+    return "zstd"
+
+
+def compress(data: bytes, codec: str) -> bytes:
+    """Compress a page with the given codec."""
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdCompressor(level=3).compress(data)
+    return zlib.compress(data, 6)
+
+
+def decompress(data: bytes, codec: str) -> bytes:
+    """Decompress a page written with the given codec."""
+    if codec == "zstd":
+        import zstandard
+
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class PageArchive:
+    """Append-only store of raw response pages, one segment file per stream.
+
+    A stream's compressed pages are written back to back to
+    ``<stream>.segment``, and ``<stream>.index`` holds one JSON line per page
+    with its key (the request path and query), offset, length and codec. The
+    index line is written after its page, so an interrupted run never leaves
+    an entry pointing past the end of the segment.
+    """
+
+    def __init__(self, directory: str, codec: str | None = None) -> None:
+        self.directory = directory
+        self.codec = codec or default_codec()
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, stream_name: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{stream_name}.{extension}")
+
+    def append(self, stream_name: str, key: str, body: bytes) -> None:
+        """Store the raw body of a page."""
+        data = compress(body, self.codec)
+        with self._lock:
+            with open(self._path(stream_name, "segment"), "ab") as segment:
+                offset = segment.seek(0, os.SEEK_END)
+                segment.write(data)
+            entry = {"key": key, "offset": offset, "length": len(data), "codec": self.codec}
+            with open(self._path(stream_name, "index"), "a") as index:
+                index.write(json.dumps(entry) + "\n")
+
+    def entries(self, stream_name: str) -> list[dict]:
+        """Return the index entries of a stream, keeping the latest page per key."""
+        index_path = self._path(stream_name, "index")
+        if not os.path.exists(index_path):
+            return []
+        latest = {}
+        with open(index_path) as index:
+            for line in index:
+                if line.strip():
+                    entry = json.loads(line)
+                    # Re-fetched pages replace older copies, in their new position.
+                    latest.pop(entry["key"], None)
+                    latest[entry["key"]] = entry
+        return list(latest.values())
+
+    def pages(self, stream_name: str) -> Iterator[tuple[str, bytes]]:
+        """Yield ``(key, body)`` for every archived page of a stream, in sync order."""
+        entries = self.entries(stream_name)
+        if not entries:
+            return
+        with open(self._path(stream_name, "segment"), "rb") as segment:
+            with mmap.mmap(segment.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                for entry in entries:
+                    start = entry["offset"]
+                    data = view[start : start + entry["length"]]
+                    yield entry["key"], decompress(data, entry["codec"])
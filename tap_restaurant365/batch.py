@@ -0,0 +1,127 @@
+"""Batch file output (Singer BATCH messages) for tap-restaurant365."""
+
+from __future__ import annotations
+
+import gzip
+import json
+import os
+import uuid
+from typing import IO, Any
+
+import singer
+
+DEFAULT_BATCH_MAX_RECORDS = 100000
+
+BATCH_FORMATS = ("jsonl", "parquet")
+
+
+def _arrow_type(pa: Any, property_schema: dict) -> Any:  # noqa: ANN401
+    types = property_schema.get("type", ["string"])
+    types = [types] if isinstance(types, str) else types
+    if "integer" in types:
+        return pa.int64()
+    if "number" in types:
+        return pa.float64()
+    if "boolean" in types:
+        return pa.bool_()
+    # Strings, date-times and anything nested are written as strings.
+    return pa.string()
+
+
+def arrow_schema(schema: dict) -> Any:  # noqa: ANN401
+    """Build a pyarrow schema from a stream's JSON schema."""
+    import pyarrow as pa
+
+    return pa.schema(
+        [
+            pa.field(name, _arrow_type(pa, property_schema))
+            for name, property_schema in schema.get("properties", {}).items()
+        ]
+    )
+
+
+class _Batch:
+    """Records of one stream alias waiting to be written to a batch file."""
+
+    def __init__(self, filepath: str, file_format: str) -> None:
+        self.filepath = filepath
+        self.count = 0
+        self.rows: list[dict] = []
+        self.handle: IO[bytes] | None = None
+        if file_format == "jsonl":
+            self.handle = gzip.open(filepath, "wb")
+
+
+class BatchWriter:
+    """Write a stream's records to compressed files and emit BATCH messages.
+
+    Records are grouped per output stream (stream maps may alias or split a
+    stream). A file is closed and announced with a BATCH message when it holds
+    ``max_records`` records, or when ``flush`` is called before a STATE
+    message so that state never runs ahead of the records the target has seen.
+    """
+
+    def __init__(
+        self,
+        schema: dict,
+        directory: str,
+        file_format: str = "jsonl",
+        max_records: int = DEFAULT_BATCH_MAX_RECORDS,
+    ) -> None:
+        if file_format not in BATCH_FORMATS:
+            raise ValueError(
+                f"Unsupported batch format '{file_format}', expected one of {BATCH_FORMATS}."
+            )
+        self.schema = schema
+        self.directory = os.path.abspath(directory)
+        self.file_format = file_format
+        self.max_records = max_records
+        self._arrow_schema = arrow_schema(schema) if file_format == "parquet" else None
+        self._batches: dict[str, _Batch] = {}
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _open(self, stream_name: str) -> _Batch:
+        extension = "jsonl.gz" if self.file_format == "jsonl" else "parquet"
+        filename = f"{stream_name}-{uuid.uuid4().hex}.{extension}"
+        return _Batch(os.path.join(self.directory, filename), self.file_format)
+
+    def write(self, stream_name: str, record: dict) -> None:
+        """Add a record to the current batch file of ``stream_name``."""
+        batch = self._batches.get(stream_name)
+        if batch is None:
+            batch = self._batches[stream_name] = self._open(stream_name)
+        if batch.handle is not None:
+            batch.handle.write(json.dumps(record, default=str).encode())
+            batch.handle.write(b"\n")
+        else:
+            batch.rows.append(record)
+        batch.count += 1
+        if batch.count >= self.max_records:
+            self._close(stream_name)
+
+    def _close(self, stream_name: str) -> None:
+        batch = self._batches.pop(stream_name)
+        if batch.handle is not None:
+            batch.handle.close()
+            compression = "gzip"
+        else:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            table = pa.Table.from_pylist(batch.rows, schema=self._arrow_schema)
+            pq.write_table(table, batch.filepath, compression="snappy")
+            compression = "snappy"
+        singer.write_message(
+            singer.BatchMessage(
+                stream_name,
+                batch.filepath,
+                file_format=self.file_format,
+                compression=compression,
+                batch_size=batch.count,
+            )
+        )
+
+    def flush(self) -> None:
+        """Close every open batch file and emit its BATCH message."""
+        for stream_name in list(self._batches):
+            self._close(stream_name)
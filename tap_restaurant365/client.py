@@ -2,9 +2,15 @@
 
 from __future__ import annotations
 
-from datetime import timedelta
+import copy
+import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures import wait
+from datetime import datetime, timedelta
 from http import HTTPStatus
-from typing import Any, Callable, Generator
+from typing import Any, Callable, Generator, Iterable, Iterator
 from urllib.parse import parse_qs, urlparse
 
 import backoff
@@ -12,20 +18,93 @@ import requests
 from dateutil import parser
 from hotglue_singer_sdk.authenticators import BasicAuthenticator
 from hotglue_singer_sdk.exceptions import FatalAPIError, RetriableAPIError
+from hotglue_singer_sdk.helpers._catalog import get_selected_schema
 from hotglue_singer_sdk.streams import RESTStream
 
 import singer
 from singer import StateMessage
 
+from tap_restaurant365.archive import PageArchive
+from tap_restaurant365.batch import DEFAULT_BATCH_MAX_RECORDS, BatchWriter
+from tap_restaurant365.dedup import DEFAULT_MAX_KEYS, RecordDeduplicator
+from tap_restaurant365.deletions import DELETED_AT, DELETED_AT_SCHEMA, tombstone
+from tap_restaurant365.filters import (
+    PUSHDOWN_FILTERS,
+    find_filter_fields,
+    selected_values,
+)
+from tap_restaurant365.latency import duration_tracker, latency_tracker
+from tap_restaurant365.odata import (
+    DEFAULT_NODE_LIMIT,
+    Clause,
+    QueryTemplate,
+    chunked,
+    one_of,
+)
+from tap_restaurant365.planner import Probe, SyncEstimate, estimate
+from tap_restaurant365.prefetch import prefetch
+from tap_restaurant365.request_engine import RequestEngine
+from tap_restaurant365.rows import CompactRow, as_dict, row_class
+
 _Auth = Callable[[requests.PreparedRequest], requests.PreparedRequest]
 
+# Rows per page returned by the Restaurant365 OData API.
+PAGE_SIZE = 5000
+
+# Adaptive timeouts are this multiple of the endpoint's p99 latency, but
+# never shorter than MIN_TIMEOUT seconds.
+TIMEOUT_MULTIPLIER = 3
+MIN_TIMEOUT = 10
+# Quantile of the endpoint's latency after which a request is hedged.
+HEDGE_QUANTILE = 0.95
+
+
+class WindowEnd:
+    """Marks the end of a planned unit (window or batch) in a stream of pages."""
+
+    __slots__ = ("context", "next_page_token")
+
+    def __init__(self, context: dict | None, next_page_token: Any | None) -> None:
+        self.context = context
+        self.next_page_token = next_page_token
+
 
 class Restaurant365Stream(RESTStream):
     """Restaurant365 stream class."""
 
     skip = 0
     days_delta = 10
-    timeout = 60
+    # Request timeout in seconds, and the upper bound of adaptive timeouts.
+    max_timeout = 60
+    _hedge_executor = None
+    # Set after a request times out, so retries wait up to `max_timeout`.
+    _timed_out = False
+    # Filter name -> column, for filters whose ID column is not named after
+    # the ID field (by default columns are matched on the field name).
+    pushdown_fields: dict[str, str] | None = None
+    # Selected IDs per column, set from the selected filters.
+    pushdown_values: dict[str, list[str]] | None = None
+    # Filter nodes each request needs for its own clause (e.g. transaction IDs).
+    request_filter_nodes = 0
+    # Parse rows into compact objects until they are written (high-volume streams).
+    compact_rows = False
+    _tombstone_schema_written = False
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        if self.config.get("propagate_deletes") and self.accepts_tombstones:
+            properties = {**self.schema.get("properties", {}), DELETED_AT: DELETED_AT_SCHEMA}
+            self.schema = {**self.schema, "properties": properties}
+        self.query_template, self.filter_chunks = self.push_down_filters(
+            self.build_query_template()
+        )
+        self.row_class = self.build_row_class()
+        self.deduplicator = self.build_deduplicator()
+        self.batch_writer = self.build_batch_writer()
+        self.page_archive = self.build_page_archive()
+        if self.batch_writer is not None:
+            # Interim STATE messages close the open batch files, so align them.
+            self.STATE_MSG_FREQUENCY = self.batch_writer.max_records
 
     @property
     def url_base(self) -> str:
@@ -57,22 +136,120 @@ class Restaurant365Stream(RESTStream):
         # headers["Private-Token"] = self.config.get("auth_token")  # noqa: ERA001
         return headers
 
+    @property
+    def timeout(self) -> float:
+        """Return the request timeout, adapted to the endpoint's observed p99 latency.
+
+        Once a request has timed out, the stream falls back to `max_timeout`
+        until a request succeeds again.
+        """
+        if not self.config.get("adaptive_timeouts") or self._timed_out:
+            return self.max_timeout
+        p99 = latency_tracker.quantile(self.path, 0.99)
+        if p99 is None:
+            return self.max_timeout
+        return min(self.max_timeout, max(MIN_TIMEOUT, p99 * TIMEOUT_MULTIPLIER))
+
+    def _request(
+        self, prepared_request: requests.PreparedRequest, context: dict | None
+    ) -> requests.Response:
+        """Send a request, hedging it if enabled, and record its latency.
+
+        Timed out requests are recorded at their timeout, so they raise the
+        endpoint's p99 instead of being left out of it.
+        """
+        timeout = self.timeout
+        try:
+            if self.config.get("hedge_requests"):
+                response = self._hedged_request(prepared_request, context)
+            else:
+                response = self._timed_request(prepared_request, context)
+        except requests.exceptions.Timeout:
+            latency_tracker.record(self.path, timeout)
+            self._timed_out = True
+            raise
+        latency_tracker.record(self.path, response.elapsed.total_seconds())
+        self._timed_out = False
+        return response
+
+    def _timed_request(
+        self, prepared_request: requests.PreparedRequest, context: dict | None
+    ) -> requests.Response:
+        """Send a request and record how long it took, body download included."""
+        started = time.monotonic()
+        response = super()._request(prepared_request, context)
+        duration_tracker.record(self.path, time.monotonic() - started)
+        return response
+
+    def _hedged_request(
+        self, prepared_request: requests.PreparedRequest, context: dict | None
+    ) -> requests.Response:
+        """Send a duplicate request once the first one exceeds the expected latency.
+
+        Whichever response arrives first is used; the slower request is left
+        to finish (or time out) in the background.
+        """
+        delay = duration_tracker.quantile(self.path, HEDGE_QUANTILE)
+        send = self._timed_request
+        if delay is None:
+            return send(prepared_request, context)
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(
+                max_workers=4 * self.max_requests_in_flight,
+                thread_name_prefix=f"{self.name}-hedge",
+            )
+        primary = self._hedge_executor.submit(send, prepared_request, context)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
+            pass
+        self.logger.debug(
+            f"Hedging request to {prepared_request.path_url} after {delay:.2f}s."
+        )
+        hedge = self._hedge_executor.submit(send, prepared_request.copy(), context)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+                error = error or future.exception()
+        raise error
+
+    def sync(self, context: dict | None = None) -> None:
+        """Sync the stream, then release its hedging threads."""
+        try:
+            super().sync(context)
+        finally:
+            if self._hedge_executor is not None:
+                # Requests that lost their race are left to finish on their own.
+                self._hedge_executor.shutdown(wait=False)
+                self._hedge_executor = None
+
     def get_next_page_token(
         self, response: requests.Response, previous_token: Any | None
     ) -> Any | None:
-        data = response.json()
-        next_page_token = None
-        if "@odata.nextLink" in data:
-            url = data["@odata.nextLink"]
+        return self.next_link_skip(response)
+
+    def next_link_skip(self, response: requests.Response) -> int | None:
+        """Return the `$skip` of the response's `@odata.nextLink`, if any."""
+        url = self.next_link(response)
+        if url:
             parsed_url = urlparse(url)
             # Extract the query parameters
             params = parse_qs(parsed_url.query)
             if "$skip" in params and len(params["$skip"]) > 0 :
                 return int(params["$skip"][0])
-            
-        return next_page_token
+        return None
 
     def get_starting_time(self, context):
+        if self.checkpoint_pages:
+            checkpoint = self.get_context_state(context).get("checkpoint")
+            if checkpoint:
+                # Resume an interrupted sync where it stopped, including the
+                # rows at the checkpoint itself.
+                return parser.parse(checkpoint)
         start_date = self.config.get("start_date")
         rep_key = None
         if start_date:
@@ -82,6 +259,251 @@ class Restaurant365Stream(RESTStream):
             rep_key = rep_key + timedelta(seconds=1)
         return rep_key or start_date
 
+    @property
+    def window_delta(self) -> timedelta | None:
+        """Return the time span covered by a single request, if windowed."""
+        window_days = self.config.get("window_days")
+        return timedelta(days=window_days) if window_days else None
+
+    def build_query_template(self) -> QueryTemplate:
+        """Return the precompiled OData query template for this stream.
+
+        Rows are ordered by the replication key, with the primary keys as tie
+        breakers, so `$skip` pages stay stable and every page ends at a point
+        the sync can be resumed from.
+        """
+        orderby = None
+        if self.replication_key:
+            orderby = ",".join(dict.fromkeys([self.replication_key, *self.primary_keys]))
+        return QueryTemplate(
+            range_key=self.replication_key,
+            bounded=self.window_delta is not None,
+            orderby=orderby,
+        )
+
+    def apply_catalog(self, catalog) -> None:
+        super().apply_catalog(catalog)
+        # The catalog may change the replication or primary keys, rebuild
+        # everything derived from them.
+        self.query_template, self.filter_chunks = self.push_down_filters(
+            self.build_query_template()
+        )
+        self.row_class = self.build_row_class()
+        self.deduplicator = self.build_deduplicator()
+        self.batch_writer = self.build_batch_writer()
+
+    @property
+    def filter_fields(self) -> dict[str, str]:
+        """Return the pushdown filters of the stream, mapped to their columns."""
+        if self.pushdown_fields is not None:
+            return self.pushdown_fields
+        return find_filter_fields(self.schema.get("properties", {}))
+
+    def get_available_filters_metadata(self) -> dict[str, Any] | None:
+        filters = {
+            name: {
+                "label": PUSHDOWN_FILTERS[name].label,
+                "supported_operators": ["IN", "EQ"],
+                "target_field": field,
+                "options": PUSHDOWN_FILTERS[name].options,
+            }
+            for name, field in self.filter_fields.items()
+        }
+        if not filters:
+            return None
+        return {
+            "supported_operators": [],
+            "supports_nesting_clauses": False,
+            "filters": filters,
+        }
+
+    def get_available_filters_reference_data(
+        self, fields_to_include: set[str]
+    ) -> list[dict[str, Any]]:
+        """Return every row of the stream as `Name (ID)` filter options."""
+        spec = next(
+            (spec for spec in PUSHDOWN_FILTERS.values() if spec.source_stream == self.name),
+            None,
+        )
+        if spec is None:
+            return super().get_available_filters_reference_data(fields_to_include)
+        rows = []
+        url = f"{self.url_base}{self.path}"
+        params = {"$orderby": spec.name_field}
+        while url:
+            prepared_request = self.build_prepared_request("GET", url, params=params)
+            response = self.request_decorator(self._request)(prepared_request, None)
+            data = response.json()
+            rows.extend(data.get("value", []))
+            url = data.get("@odata.nextLink")
+            params = None  # nextLink URL already includes query params
+
+        return [
+            {
+                spec.field: row[spec.field],
+                spec.name_field: row[spec.name_field],
+                spec.option_field: f"{row[spec.name_field]} ({row[spec.field]})",
+            }
+            for row in rows
+        ]
+
+    def setup_selected_filters(self) -> None:
+        """Collect the selected filter IDs to push down into every request."""
+        values: dict[str, list[str]] = {}
+        for clause in (self._selected_filters or {}).values():
+            if not isinstance(clause, dict):
+                continue
+            field = self.filter_fields.get(clause.get("field"))
+            if field is None:
+                self.logger.warning(
+                    f"Ignoring unsupported filter '{clause.get('field')}' for {self.name}."
+                )
+                continue
+            values.setdefault(field, []).extend(selected_values(clause))
+        self.pushdown_values = values
+
+    def push_down_filters(
+        self, template: QueryTemplate
+    ) -> tuple[QueryTemplate, list[Clause] | None]:
+        """Add the selected filters to the query template.
+
+        Filters that fit under the node limit become part of every request.
+        Otherwise the longest list of IDs is split into chunks, returned
+        separately, and every planned request is sent once per chunk.
+        """
+        values = {field: ids for field, ids in (self.pushdown_values or {}).items() if ids}
+        if not values:
+            return template, None
+        fields = sorted(values, key=lambda field: len(values[field]))
+        full = template.extend(*(one_of(field, values[field]) for field in fields))
+        if full.node_count + self.request_filter_nodes <= DEFAULT_NODE_LIMIT:
+            return full, None
+        *others, largest = fields
+        template = template.extend(*(one_of(field, values[field]) for field in others))
+        base_nodes = template.node_count + self.request_filter_nodes
+        chunks = [
+            one_of(largest, ids) for ids in chunked(values[largest], base_nodes=base_nodes)
+        ]
+        self.logger.info(
+            f"Splitting the {largest} filter of {self.name} into {len(chunks)} requests."
+        )
+        return template, chunks
+
+    def get_filter_chunk(self, next_page_token: Any | None) -> Clause | None:  # noqa: ANN401
+        """Return the filter chunk a planned request is restricted to, if any."""
+        if not self.filter_chunks or not isinstance(next_page_token, dict):
+            return None
+        return self.filter_chunks[next_page_token.get("chunk", 0)]
+
+    def _split_by_filter_chunks(
+        self, plan: Iterable[tuple[dict | None, Any]] | None
+    ) -> Iterable[tuple[dict | None, Any]] | None:
+        if plan is None or not self.filter_chunks:
+            return plan
+        return (
+            (context, {**(token or {}), "chunk": index})
+            for context, token in plan
+            for index in range(len(self.filter_chunks))
+        )
+
+    def get_dry_run_plan(
+        self, context: dict | None
+    ) -> Iterable[tuple[dict | None, Any]]:
+        """Return every planned unit of a sync, for estimating it without running it."""
+        return self._split_by_filter_chunks(
+            self.get_request_plan(context) or [(context, None)]
+        )
+
+    def probe(self, context: dict | None, next_page_token: Any | None) -> Probe:  # noqa: ANN401
+        """Count the rows of a planned unit with a `$count` request for a single row."""
+        prepared_request = self.prepare_request(context, next_page_token=next_page_token)
+        prepared_request.prepare_url(prepared_request.url, {"$count": "true", "$top": 1})
+        response = self.request_decorator(self._request)(prepared_request, context)
+        data = response.json()
+        rows = data.get("value") or []
+        return Probe(
+            data.get("@odata.count", len(rows)),
+            rows[0] if rows else None,
+            response.elapsed.total_seconds(),
+        )
+
+    def probe_units(self, units: Iterable[tuple[dict | None, Any]]) -> list[Probe]:
+        """Probe planned units, `max_requests_in_flight` at a time."""
+        with ThreadPoolExecutor(max_workers=self.max_requests_in_flight) as executor:
+            return list(executor.map(lambda unit: self.probe(*unit), units))
+
+    def estimate_sync(self, context: dict | None = None) -> list[SyncEstimate]:
+        """Estimate the requests, rows, bytes and time of syncing the stream."""
+        probes = self.probe_units(self.get_dry_run_plan(context))
+        return [self.estimate_from_probes(self.name, probes)]
+
+    def estimate_from_probes(self, stream_name: str, probes: list[Probe]) -> SyncEstimate:
+        window_days = None
+        if self.replication_key and self.window_delta is not None:
+            window_days = self.window_delta.total_seconds() / 86400
+        return estimate(
+            stream_name,
+            probes,
+            concurrency=self.max_requests_in_flight,
+            page_size=PAGE_SIZE,
+            window_days=window_days,
+        )
+
+    def build_row_class(self) -> type[CompactRow] | None:
+        """Return the compact row class for the stream's schema, if enabled."""
+        if not self.compact_rows:
+            return None
+        return row_class(f"{type(self).__name__}Row", self.schema.get("properties", {}))
+
+    def decode_page(self, response: requests.Response) -> dict:
+        """Decode a page once, keeping its `@odata.nextLink` on the response.
+
+        Pagination may read the next link before or after the page's records
+        are parsed (prefetching and concurrent requests compute it first), so
+        whichever comes first decodes the page and the other reuses it.
+        """
+        data = response.__dict__.get("_odata_page")
+        if data is None:
+            if self.row_class is None:
+                data = response.json()
+            else:
+                data = json.loads(response.content, object_pairs_hook=self.row_class.from_pairs)
+            response._odata_page = data
+            response._odata_next_link = data.get("@odata.nextLink")
+        return data
+
+    def next_link(self, response: requests.Response) -> str | None:
+        """Return the response's `@odata.nextLink`, if any."""
+        if "_odata_next_link" not in response.__dict__:
+            self.decode_page(response)
+        return response._odata_next_link
+
+    def parse_response(self, response: requests.Response) -> Iterable[dict]:
+        """Parse the response and return an iterator of result records."""
+        data = self.decode_page(response)
+        # Only the records being yielded keep the decoded page alive.
+        del response._odata_page
+        yield from data.get("value", [])
+
+    def build_deduplicator(self) -> RecordDeduplicator | None:
+        """Return the record deduplicator, if enabled for this stream."""
+        if not self.config.get("deduplicate_records") or not self.primary_keys:
+            return None
+        version_property = None
+        if "modifiedOn" in self.schema.get("properties", {}):
+            version_property = "modifiedOn"
+        return RecordDeduplicator(
+            self.primary_keys,
+            version_property=version_property,
+            max_keys=self.config.get("deduplication_max_keys", DEFAULT_MAX_KEYS),
+        )
+
+    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+        """Drop records already emitted by an overlapping window or retried page."""
+        if self.deduplicator and self.deduplicator.seen(row):
+            return None
+        return row
+
     def get_url_params(
         self,
         context: dict | None,  # noqa: ARG002
@@ -96,14 +518,277 @@ class Restaurant365Stream(RESTStream):
         Returns:
             A dictionary of URL query parameters.
         """
-
-        params: dict = {}
+        if isinstance(next_page_token, dict):
+            return self.query_template.params(
+                next_page_token.get("token"),
+                next_page_token.get("end"),
+                next_page_token.get("skip"),
+                extra=self.get_filter_chunk(next_page_token),
+            )
+        start_date = None
         if self.replication_key:
-            start_date = self.get_starting_time(context).strftime("%Y-%m-%dT%H:%M:%SZ")
-            params["$filter"] = f"{self.replication_key} ge {start_date}"
-        if next_page_token:
-            params["$skip"] = next_page_token
-        return params
+            start_date = self.get_starting_time(context)
+        return self.query_template.params(start=start_date, skip=next_page_token)
+
+    @property
+    def max_requests_in_flight(self) -> int:
+        """Return how many requests the stream may keep running at once."""
+        return max(1, int(self.config.get("max_requests_in_flight") or 1))
+
+    @property
+    def parallelization_limit(self) -> int:
+        """Let the SDK size the connection pool for the requests kept in flight."""
+        return self.max_requests_in_flight
+
+    def get_request_plan(
+        self, context: dict | None
+    ) -> Iterable[tuple[dict | None, Any]] | None:
+        """Return the first request of each independent unit of work.
+
+        Streams that know their windows (or batches) upfront return an iterable
+        of ``(context, next_page_token)`` pairs, which lets the async engine
+        fetch several of them concurrently. Returns None to page sequentially.
+
+        Replicated streams plan one unit per `window_days` window, or a single
+        unit covering everything since the starting time.
+        """
+        if not self.replication_key:
+            return None
+        start_date = self.get_starting_time(context)
+        if self.window_delta is None or start_date is None:
+            return [(context, {"token": start_date, "skip": 0})]
+        return self._iter_window_tokens(context, start_date)
+
+    def _iter_window_tokens(
+        self,
+        context: dict | None,
+        start: datetime | None = None,
+        stop: datetime | None = None,
+        **extra: Any,  # noqa: ANN401
+    ) -> Iterator[tuple[dict | None, dict]]:
+        """Yield a token per window from `start` (default: the starting time).
+
+        Windows run until now, or until `stop` if given, in which case the last
+        window is cut short so it never extends past it.
+        """
+        window_start = (start or self.get_starting_time(context)).replace(tzinfo=None)
+        until = stop or datetime.today()
+        while window_start < until:
+            window_end = window_start + self.window_delta
+            if stop:
+                window_end = min(window_end, stop)
+            yield context, {"token": window_start, "skip": 0, "end": window_end, **extra}
+            window_start = window_end
+
+    @property
+    def requires_request_plan(self) -> bool:
+        """Return True if the stream must follow its request plan even when sequential.
+
+        Replicated streams do, so that every page can be checkpointed, and so do
+        streams whose filters are split into chunks.
+        """
+        return bool(self.replication_key or self.filter_chunks)
+
+    @property
+    def checkpoint_pages(self) -> bool:
+        """Return True if the sync position is checkpointed after every page."""
+        return bool(self.replication_key)
+
+    def get_next_page_token_in_window(
+        self, response: requests.Response, previous_token: Any | None
+    ) -> Any | None:
+        """Return the next `$skip` page of the same planned unit, if any."""
+        skip = self.next_link_skip(response)
+        if skip is None:
+            return None
+        previous_token = previous_token or {"token": None, "skip": 0}
+        return {**previous_token, "skip": skip}
+
+    @property
+    def prefetch_pages(self) -> int:
+        """Return how many pages may be fetched ahead of the one being processed."""
+        return max(0, int(self.config.get("prefetch_pages") or 0))
+
+    def _fetch_page(
+        self, context: dict | None, next_page_token: Any | None, send: Callable
+    ) -> requests.Response:
+        prepared_request = self.prepare_request(context, next_page_token=next_page_token)
+        response = send(prepared_request, context)
+        self.update_sync_costs(prepared_request, response, context)
+        return response
+
+    def _iter_pages(
+        self, context: dict | None, plan: Iterable[tuple[dict | None, Any]] | None
+    ) -> Iterator[requests.Response | object]:
+        """Fetch pages one at a time, following the plan when there is one."""
+        send = self.request_decorator(self._request)
+        if plan is None:
+            next_page_token = None
+            while True:
+                response = self._fetch_page(context, next_page_token, send)
+                yield response
+                previous_token = copy.deepcopy(next_page_token)
+                next_page_token = self.get_next_page_token(response, previous_token)
+                if next_page_token and next_page_token == previous_token:
+                    raise RuntimeError(
+                        f"Loop detected in pagination. "
+                        f"Pagination token {next_page_token} is identical to prior token."
+                    )
+                if not next_page_token:
+                    return
+        for unit_context, first_token in plan:
+            next_page_token = first_token
+            while True:
+                response = self._fetch_page(unit_context, next_page_token, send)
+                yield response
+                next_page_token = self.get_next_page_token_in_window(
+                    response, next_page_token
+                )
+                if not next_page_token:
+                    break
+            yield WindowEnd(unit_context, first_token)
+
+    def _iter_concurrent_pages(
+        self, plan: Iterable[tuple[dict | None, Any]]
+    ) -> Iterator[requests.Response | object]:
+        """Fetch the planned units concurrently, yielding pages in plan order."""
+        with RequestEngine(self, self.max_requests_in_flight) as engine:
+            for unit_context, first_token, response in engine.fetch_ordered(plan):
+                next_page_token = first_token
+                while response is not None:
+                    yield response
+                    next_page_token = self.get_next_page_token_in_window(
+                        response, next_page_token
+                    )
+                    response = (
+                        engine.fetch(unit_context, next_page_token)
+                        if next_page_token
+                        else None
+                    )
+                yield WindowEnd(unit_context, first_token)
+
+    def request_records(self, context: dict | None) -> Iterable[dict]:
+        """Request records, overlapping requests with processing if enabled.
+
+        With ``max_requests_in_flight`` above one, planned units are fetched
+        concurrently. With ``prefetch_pages`` set, a background thread fetches
+        up to that many pages ahead of the page being processed; windowed
+        streams then follow their request plan, as their regular pagination
+        depends on the state written while records are processed.
+        """
+        if self.replaying:
+            yield from self._replay_records()
+            return
+        if (
+            self.max_requests_in_flight <= 1
+            and not self.prefetch_pages
+            and not self.requires_request_plan
+            and self.page_archive is None
+        ):
+            yield from super().request_records(context)
+            return
+
+        plan = self._split_by_filter_chunks(self.get_request_plan(context))
+        if self.max_requests_in_flight > 1 and plan is not None:
+            pages = self._iter_concurrent_pages(plan)
+        elif self.prefetch_pages:
+            pages = prefetch(
+                self._iter_pages(context, plan),
+                self.prefetch_pages,
+                name=f"{self.name}-prefetch",
+            )
+        else:
+            pages = self._iter_pages(context, plan)
+
+        for page in pages:
+            if isinstance(page, WindowEnd):
+                chunk = (page.next_page_token or {}).get("chunk")
+                if chunk is None or chunk == len(self.filter_chunks) - 1:
+                    # Units are only complete once their last filter chunk is.
+                    self.finish_window(page.context, page.next_page_token)
+                continue
+            if self.page_archive is not None:
+                self.page_archive.append(self.name, page.request.path_url, page.content)
+            record = None
+            for record in self.parse_response(page):
+                yield record
+            if record is not None:
+                self.finish_page(context, record)
+        if self.checkpoint_pages:
+            # The sync is complete, the regular bookmark takes over.
+            self.get_context_state(context).pop("checkpoint", None)
+
+    def build_page_archive(self) -> PageArchive | None:
+        """Return the raw page archive, if archiving or replaying is enabled."""
+        directory = self.config.get("archive_directory")
+        if not directory:
+            if self.replaying:
+                raise ValueError("replay_archive requires archive_directory to be set.")
+            return None
+        return PageArchive(directory)
+
+    @property
+    def replaying(self) -> bool:
+        """Return True if records are replayed from the page archive."""
+        return bool(self.config.get("replay_archive"))
+
+    def _replay_records(self) -> Iterator[dict]:
+        """Parse the archived pages of the stream, then replay its child streams."""
+        for _, body in self.page_archive.pages(self.name):
+            response = requests.Response()
+            response.status_code = HTTPStatus.OK
+            response._content = body
+            yield from self.parse_response(response)
+        for child_stream in self.child_streams:
+            if child_stream.selected or child_stream.has_selected_descendents:
+                child_stream.sync()
+
+    def _sync_children(self, child_context: dict) -> None:
+        if self.replaying:
+            # Child streams replay their whole archive once the parent is done.
+            return
+        super()._sync_children(child_context)
+
+    def finish_page(self, context: dict | None, last_record: dict) -> None:
+        """Checkpoint the sync once every record of a page was processed."""
+        if not self.checkpoint_pages or not last_record.get(self.replication_key):
+            return
+        if self.filter_chunks:
+            # Rows of different filter chunks interleave, only windows end
+            # at a point the sync can resume from.
+            return
+        # Rows are ordered by the replication key: every row before the last
+        # value is synced, rows sharing that value may continue on the next page.
+        self._write_checkpoint(context, last_record[self.replication_key])
+
+    def _write_checkpoint(self, context: dict | None, value: str | datetime) -> None:
+        if isinstance(value, datetime):
+            value = value.isoformat()
+        state = self.get_context_state(context)
+        checkpoint = state.get("checkpoint")
+        if checkpoint and parser.parse(value).replace(tzinfo=None) < parser.parse(
+            checkpoint
+        ).replace(tzinfo=None):
+            return
+        state["checkpoint"] = value
+        if self.batch_writer is None:
+            # Batched streams carry the checkpoint in their regular STATE
+            # messages instead, as every STATE closes the open batch files.
+            self._write_state_message()
+
+    def finish_window(self, context: dict | None, next_page_token: Any | None) -> None:
+        """Handle the end of a planned unit, once all its records were processed.
+
+        Args:
+            context: The context the unit was requested with.
+            next_page_token: The token of the unit's first page.
+        """
+        if self.deduplicator and self.replication_key:
+            # Each planned unit of a replicated stream is a time window.
+            self.deduplicator.rotate()
+        window_end = (next_page_token or {}).get("end")
+        if self.checkpoint_pages and window_end:
+            self._write_checkpoint(context, min(window_end, datetime.today()))
 
     def validate_response(self, response: requests.Response) -> None:
         if (
@@ -143,8 +828,67 @@ class Restaurant365Stream(RESTStream):
         """
         return 8
 
+    def build_batch_writer(self) -> BatchWriter | None:
+        """Return the batch file writer, if batch output is enabled for this stream."""
+        batch_streams = self.config.get("batch_streams") or []
+        if self.name not in batch_streams and "*" not in batch_streams:
+            return None
+        schema = self.schema
+        if self._tap_input_catalog is not None:
+            # Batch files hold the selected properties only, like RECORD messages.
+            schema = get_selected_schema(self.name, self.schema, self.mask, self.logger)
+        return BatchWriter(
+            schema,
+            directory=self.config.get("batch_directory") or "output",
+            file_format=self.config.get("batch_format") or "jsonl",
+            max_records=self.config.get("batch_max_records") or DEFAULT_BATCH_MAX_RECORDS,
+        )
+
+    def _write_record_message(self, record: dict) -> None:
+        """Write out a RECORD message, or add the record to a batch file."""
+        record = as_dict(record)
+        if self.batch_writer is None:
+            super()._write_record_message(record)
+            return
+        for record_message in self._generate_record_messages(record):
+            self.batch_writer.write(record_message.stream, record_message.record)
+
+    @property
+    def accepts_tombstones(self) -> bool:
+        """Return True if entity_deleted may write tombstones to this stream.
+
+        A deletion only carries the entity's ID, so streams with composite
+        primary keys (such as `transaction_detail`) cannot get tombstones.
+        """
+        return len(self.primary_keys or ()) == 1
+
+    def write_tombstone(self, entity_id: str, deleted_on: str) -> None:
+        """Write a record marking an entity of this stream as deleted."""
+        if not self._tombstone_schema_written:
+            # The stream may not have synced (and sent its SCHEMA) yet.
+            self._write_schema_message()
+            self._tombstone_schema_written = True
+        record = tombstone(self.primary_keys[0], entity_id, deleted_on)
+        # Always a RECORD message, the stream's batch files may be closed already.
+        for record_message in self._generate_record_messages(record):
+            singer.write_message(record_message)
+
+    def _flush_batches(self) -> None:
+        """Flush the batch files of this stream and of its child streams."""
+        for child_stream in self.child_streams:
+            if isinstance(child_stream, Restaurant365Stream):
+                child_stream._flush_batches()
+        if self.batch_writer is not None:
+            self.batch_writer.flush()
+
     def _write_state_message(self) -> None:
         """Write out a STATE message with the latest state."""
+        if self.parent_stream_type:
+            # Child streams have no bookmark of their own and may sync on the
+            # parent's worker thread. The parent's next STATE carries their
+            # state, and flushes their batches together with its own.
+            return
+        self._flush_batches()
         tap_state = self.tap_state
 
         if tap_state and tap_state.get("bookmarks"):
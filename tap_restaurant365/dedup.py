@@ -0,0 +1,58 @@
+"""Bounded in-memory record deduplication for tap-restaurant365."""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Iterable
+
+DEFAULT_MAX_KEYS = 1_000_000
+
+
+class RecordDeduplicator:
+    """Remember recently emitted records and flag repeats.
+
+    Records are identified by their primary key values plus a version property
+    (``modifiedOn`` by default), so a record that changed is emitted again.
+    Keys are kept as 64-bit digests in two generations: ``rotate`` is called
+    when a stream moves to a new window, dropping keys from two windows ago.
+    A generation that reaches half of ``max_keys`` is rotated early, which
+    bounds memory regardless of window size.
+    """
+
+    def __init__(
+        self,
+        key_properties: Iterable[str],
+        version_property: str | None = "modifiedOn",
+        max_keys: int = DEFAULT_MAX_KEYS,
+    ) -> None:
+        self.key_properties = list(key_properties)
+        if version_property and version_property not in self.key_properties:
+            self.key_properties.append(version_property)
+        self.generation_size = max(1, max_keys // 2)
+        self._current: set[int] = set()
+        self._previous: set[int] = set()
+        self.duplicates = 0
+
+    def _digest(self, record: dict) -> int:
+        values = "\x1f".join(str(record.get(key)) for key in self.key_properties)
+        digest = hashlib.blake2b(values.encode(), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def seen(self, record: dict) -> bool:
+        """Return True if the record was already emitted, else remember it."""
+        key = self._digest(record)
+        if key in self._current or key in self._previous:
+            self.duplicates += 1
+            return True
+        if len(self._current) >= self.generation_size:
+            self.rotate()
+        self._current.add(key)
+        return False
+
+    def rotate(self) -> None:
+        """Start a new generation, forgetting keys older than the previous one."""
+        self._previous = self._current
+        self._current = set()
+
+    def __len__(self) -> int:
+        return len(self._current) + len(self._previous)
@@ -0,0 +1,55 @@
+"""Deleted entity propagation for tap-restaurant365."""
+
+from __future__ import annotations
+
+import re
+from typing import Iterable
+
+# Soft delete marker set on tombstone records.
+DELETED_AT = "_sdc_deleted_at"
+
+DELETED_AT_SCHEMA = {"type": ["string", "null"], "format": "date-time"}
+
+
+def entity_key(name: str) -> str:
+    """Fold the naming variants of an entity (`TransactionDetail`, `transaction_detail`, ...)."""
+    return re.sub(r"[^a-z0-9]", "", str(name).lower())
+
+
+class DeletionIndex:
+    """Resolve `EntityDeleted` entity names to the streams holding the entities.
+
+    An entity matches the stream whose name (`transaction_detail`) folds to
+    the same key. Only entities matching no stream name fall back to the
+    streams whose endpoint (`/GLAccount`) does, so `Transaction` resolves to
+    `transaction` alone, not to the typed transaction streams sharing its
+    endpoint. Resolved names are cached, one entry per entity type.
+    """
+
+    def __init__(self, streams: Iterable[tuple[str, str]]) -> None:
+        """Build the index from ``(stream name, path)`` pairs."""
+        self._by_name: dict[str, list[str]] = {}
+        self._by_path: dict[str, list[str]] = {}
+        for name, path in streams:
+            self._by_name.setdefault(entity_key(name), []).append(name)
+            self._by_path.setdefault(entity_key(path), []).append(name)
+        self._resolved: dict[str, tuple[str, ...]] = {}
+
+    def resolve(self, entity_name: str) -> tuple[str, ...]:
+        """Return the names of the streams an entity type belongs to."""
+        streams = self._resolved.get(entity_name)
+        if streams is None:
+            key = entity_key(entity_name)
+            streams = tuple(self._by_name.get(key) or self._by_path.get(key, ()))
+            self._resolved[entity_name] = streams
+        return streams
+
+    @property
+    def unresolved(self) -> list[str]:
+        """Return the entity types seen so far that match no stream."""
+        return [name for name, streams in self._resolved.items() if not streams]
+
+
+def tombstone(key_property: str, entity_id: str, deleted_on: str) -> dict:
+    """Return the record marking an entity as deleted on its stream."""
+    return {key_property: entity_id, DELETED_AT: deleted_on}
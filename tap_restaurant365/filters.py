@@ -0,0 +1,64 @@
+"""Selected filters pushed down into Restaurant365 OData requests."""
+
+from __future__ import annotations
+
+from typing import Any, Iterable, NamedTuple
+
+
+class FilterSpec(NamedTuple):
+    """A filter offered on every stream that has a column for its ID field."""
+
+    label: str
+    # ID field, as named on the stream the options are loaded from.
+    field: str
+    # Stream whose rows are the filter options.
+    source_stream: str
+    name_field: str = "name"
+
+    @property
+    def option_field(self) -> str:
+        """Return the reference data field holding the `Name (ID)` options."""
+        return f"{self.name_field}_{self.field}"
+
+    @property
+    def options(self) -> str:
+        """Return the `options` reference of the filter's metadata."""
+        return f"reference_data.{self.source_stream}.{self.option_field}"
+
+
+PUSHDOWN_FILTERS = {
+    "vendors": FilterSpec("Vendor Name (ID)", "companyId", "vendors"),
+    "locations": FilterSpec("Location Name (ID)", "locationId", "locations"),
+    "gl_accounts": FilterSpec("GL Account Name (ID)", "glAccountId", "accounts"),
+}
+
+
+def normalize_field(field: str) -> str:
+    """Fold the naming variants of a column (`locationId`, `location_ID`, ...)."""
+    return field.replace("_", "").lower()
+
+
+def find_filter_fields(properties: Iterable[str]) -> dict[str, str]:
+    """Map each filter to the column of a stream schema holding its ID."""
+    columns = {normalize_field(name): name for name in properties}
+    return {
+        name: columns[normalize_field(spec.field)]
+        for name, spec in PUSHDOWN_FILTERS.items()
+        if normalize_field(spec.field) in columns
+    }
+
+
+def option_id(value: Any) -> str:  # noqa: ANN401
+    """Return the ID of a selected `Name (ID)` option."""
+    return str(value).rsplit("(", 1)[-1].rstrip(")")
+
+
+def selected_values(clause: dict) -> list[str]:
+    """Return the IDs selected by an `EQ` or `IN` filter clause."""
+    operator = str(clause.get("operator", "")).upper()
+    value = clause.get("value")
+    if operator == "EQ" and value is not None:
+        return [option_id(value)]
+    if operator == "IN" and value:
+        return [option_id(item) for item in value]
+    return []
@@ -0,0 +1,80 @@
+"""Per-endpoint request latency tracking for tap-restaurant365."""
+
+from __future__ import annotations
+
+import math
+import threading
+
+# Bucket bounds grow by 10% from 10ms, so quantiles are accurate to ~10%.
+MIN_LATENCY = 0.01
+GROWTH = 1.1
+BUCKETS = 128  # up to ~1900s
+# Halve all counts past this many samples, so recent latencies weigh more.
+MAX_SAMPLES = 10000
+# Samples needed before a path's quantiles are trusted.
+MIN_SAMPLES = 20
+
+
+class LatencyHistogram:
+    """Streaming histogram of request latencies with logarithmic buckets."""
+
+    def __init__(self) -> None:
+        self.counts = [0] * BUCKETS
+        self.count = 0
+
+    def record(self, seconds: float) -> None:
+        """Add a latency sample, in seconds."""
+        index = 0
+        if seconds > MIN_LATENCY:
+            index = min(BUCKETS - 1, int(math.log(seconds / MIN_LATENCY, GROWTH)))
+        self.counts[index] += 1
+        self.count += 1
+        if self.count >= MAX_SAMPLES:
+            self.counts = [count // 2 for count in self.counts]
+            self.count = sum(self.counts)
+
+    def quantile(self, q: float) -> float | None:
+        """Return the upper bound of the bucket holding quantile ``q``."""
+        if not self.count:
+            return None
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= rank:
+                return MIN_LATENCY * GROWTH ** (index + 1)
+        return MIN_LATENCY * GROWTH**BUCKETS
+
+
+class LatencyTracker:
+    """Thread-safe latency histograms keyed by endpoint path."""
+
+    def __init__(self, min_samples: int = MIN_SAMPLES) -> None:
+        self.min_samples = min_samples
+        self._histograms: dict[str, LatencyHistogram] = {}
+        self._lock = threading.Lock()
+
+    def record(self, path: str, seconds: float) -> None:
+        """Add a latency sample for ``path``."""
+        with self._lock:
+            histogram = self._histograms.get(path)
+            if histogram is None:
+                histogram = self._histograms[path] = LatencyHistogram()
+            histogram.record(seconds)
+
+    def quantile(self, path: str, q: float) -> float | None:
+        """Return quantile ``q`` of ``path``, or None until enough samples were seen."""
+        with self._lock:
+            histogram = self._histograms.get(path)
+            if histogram is None or histogram.count < self.min_samples:
+                return None
+            return histogram.quantile(q)
+
+
+# Shared by all streams, several of which read the same endpoint. Latencies
+# are the time to the response headers (`response.elapsed`), which is what
+# request timeouts apply to.
+latency_tracker = LatencyTracker()
+# Wall-clock durations of whole requests, including the body download, which
+# is what a hedged request waits for.
+duration_tracker = LatencyTracker()
@@ -0,0 +1,156 @@
+"""Background child stream pipeline for tap-restaurant365."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+from collections import deque
+from typing import Any, Callable
+
+DEFAULT_MAX_PENDING = 10000
+
+
+class SpoolQueue:
+    """FIFO queue holding up to ``max_items`` JSON-serializable items in memory.
+
+    Without a spool directory, `put` blocks while the queue is full. With one,
+    further items are appended to a spool file instead and read back in order
+    once the in-memory items are consumed, so the producer never waits.
+    """
+
+    def __init__(self, max_items: int, spool_directory: str | None = None) -> None:
+        self.max_items = max(1, max_items)
+        self._memory: deque = deque()
+        self._condition = threading.Condition()
+        self._spilled = 0
+        self._spool_path = None
+        if spool_directory:
+            os.makedirs(spool_directory, exist_ok=True)
+            fd, self._spool_path = tempfile.mkstemp(
+                prefix="spool-", suffix=".jsonl", dir=spool_directory
+            )
+            self._writer = os.fdopen(fd, "w")
+            self._reader = open(self._spool_path)
+
+    def put(self, item: Any) -> None:  # noqa: ANN401
+        """Add an item, spilling it to disk or waiting if memory is full."""
+        with self._condition:
+            if self._spool_path is None:
+                while len(self._memory) >= self.max_items:
+                    self._condition.wait()
+            elif self._spilled or len(self._memory) >= self.max_items:
+                self._writer.write(json.dumps(item) + "\n")
+                self._writer.flush()
+                self._spilled += 1
+                self._condition.notify_all()
+                return
+            self._memory.append(item)
+            self._condition.notify_all()
+
+    def get(self) -> Any:  # noqa: ANN401
+        """Remove and return the oldest item, waiting for one if needed."""
+        with self._condition:
+            while not self._memory and not self._spilled:
+                self._condition.wait()
+            if self._memory:
+                item = self._memory.popleft()
+            else:
+                item = json.loads(self._reader.readline())
+                self._spilled -= 1
+                if not self._spilled:
+                    # Everything spilled was read back, start the file over.
+                    self._writer.seek(0)
+                    self._writer.truncate()
+                    self._reader.seek(0)
+            self._condition.notify_all()
+            return item
+
+    def close(self) -> None:
+        """Remove the spool file, if any."""
+        if self._spool_path is not None:
+            self._writer.close()
+            self._reader.close()
+            os.remove(self._spool_path)
+            self._spool_path = None
+
+
+class ChildPipeline:
+    """Batch keys from parent records and sync them on a background thread.
+
+    The parent keeps paging while its keys wait in a `SpoolQueue`, and the
+    worker hands ``sync_batch`` full batches of ``batch_size`` keys (mapped to
+    a value, such as a row version) regardless of parent page boundaries.
+    `flush` is a barrier: it returns once every key put before it is synced.
+    Errors raised by ``sync_batch`` are re-raised in the parent thread.
+    """
+
+    def __init__(
+        self,
+        sync_batch: Callable[[dict], None],
+        batch_size: int,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        spool_directory: str | None = None,
+        name: str = "children",
+    ) -> None:
+        self.sync_batch = sync_batch
+        self.batch_size = max(1, batch_size)
+        self._queue = SpoolQueue(max_pending, spool_directory)
+        self._flushed: dict[int, threading.Event] = {}
+        self._flush_count = 0
+        self._error: BaseException | None = None
+        self._thread = threading.Thread(target=self._work, name=name, daemon=True)
+        self._thread.start()
+
+    def _work(self) -> None:
+        batch: dict = {}
+        while True:
+            item = self._queue.get()
+            if isinstance(item, dict):
+                # Control message: flush, close or abort.
+                if batch and self._error is None and not item.get("abort"):
+                    self._sync(batch)
+                batch = {}
+                if "flush" in item:
+                    self._flushed.pop(item["flush"]).set()
+                    continue
+                return
+            key, value = item
+            batch[key] = value
+            if len(batch) >= self.batch_size:
+                if self._error is None:
+                    self._sync(batch)
+                batch = {}
+
+    def _sync(self, batch: dict) -> None:
+        try:
+            self.sync_batch(batch)
+        except BaseException as error:  # noqa: BLE001
+            # Keep draining the queue so the parent never blocks on it.
+            self._error = error
+
+    def _raise_error(self) -> None:
+        if self._error is not None:
+            raise self._error
+
+    def put(self, key: str, value: Any = None) -> None:  # noqa: ANN401
+        """Queue a key for the next batch."""
+        self._raise_error()
+        self._queue.put([key, value])
+
+    def flush(self) -> None:
+        """Sync every queued key, including a final partial batch."""
+        self._flush_count += 1
+        flushed = self._flushed[self._flush_count] = threading.Event()
+        self._queue.put({"flush": self._flush_count})
+        flushed.wait()
+        self._raise_error()
+
+    def close(self, abort: bool = False) -> None:
+        """Stop the worker, syncing the queued keys first unless aborting."""
+        self._queue.put({"abort": abort})
+        self._thread.join()
+        self._queue.close()
+        if not abort:
+            self._raise_error()
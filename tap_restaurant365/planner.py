@@ -0,0 +1,82 @@
+"""Dry-run sync cost estimation for tap-restaurant365."""
+
+from __future__ import annotations
+
+import json
+import math
+import statistics
+from typing import Iterable, NamedTuple
+
+# Assumed transfer rate of page bodies, probes only measure request latency.
+DEFAULT_THROUGHPUT = 2_000_000  # bytes per second
+
+
+class Probe(NamedTuple):
+    """Result of a `$count` probe of one planned unit (window, batch, ...)."""
+
+    rows: int
+    # A row returned with the count, used to size rows.
+    sample: dict | None
+    seconds: float
+
+
+class SyncEstimate(NamedTuple):
+    """Estimated cost of syncing a stream."""
+
+    stream: str
+    units: int
+    requests: int
+    rows: int
+    bytes: int
+    seconds: float
+    # Window size that would put about one page of rows in each window.
+    suggested_window_days: float | None = None
+
+    def to_dict(self) -> dict:
+        """Return the estimate as a JSON-serializable dict."""
+        return {**self._asdict(), "seconds": round(self.seconds, 1)}
+
+
+def row_bytes(probes: Iterable[Probe]) -> float:
+    """Return the average serialized size of the sampled rows."""
+    sizes = [len(json.dumps(probe.sample)) for probe in probes if probe.sample]
+    return statistics.fmean(sizes) if sizes else 0.0
+
+
+def estimate(
+    stream: str,
+    probes: list[Probe],
+    concurrency: int,
+    page_size: int,
+    throughput: float = DEFAULT_THROUGHPUT,
+    window_days: float | None = None,
+) -> SyncEstimate:
+    """Estimate a stream's sync from the probes of its planned units.
+
+    Each unit needs one request per page of rows (at least one), and every
+    request costs the median probe latency plus the transfer of its rows.
+    ``concurrency`` requests run at a time.
+    """
+    requests = sum(max(1, math.ceil(probe.rows / page_size)) for probe in probes)
+    rows = sum(probe.rows for probe in probes)
+    size = int(rows * row_bytes(probes))
+    latency = statistics.median(probe.seconds for probe in probes) if probes else 0.0
+    seconds = (requests * latency + size / throughput) / max(1, concurrency)
+    suggested = None
+    if window_days and rows:
+        # Never more than the whole planned span.
+        suggested = round(window_days * len(probes) * min(1, page_size / rows), 2)
+    return SyncEstimate(stream, len(probes), requests, rows, size, seconds, suggested)
+
+
+def total(estimates: Iterable[SyncEstimate]) -> SyncEstimate:
+    """Sum the estimates of streams synced one after another."""
+    estimates = list(estimates)
+    return SyncEstimate(
+        "total",
+        sum(item.units for item in estimates),
+        sum(item.requests for item in estimates),
+        sum(item.rows for item in estimates),
+        sum(item.bytes for item in estimates),
+        sum(item.seconds for item in estimates),
+    )
@@ -0,0 +1,72 @@
+"""Concurrent request engine for Restaurant365 streams."""
+
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    import requests
+
+    from tap_restaurant365.client import Restaurant365Stream
+
+
+class RequestEngine:
+    """Keep up to ``max_in_flight`` stream requests running on a thread pool.
+
+    Requests are built with the stream's own ``prepare_request`` and sent through
+    its decorated ``_request`` (so ``get_url_params``, backoff and
+    ``validate_response`` behave exactly as in a sequential sync). Responses are
+    handed back in plan order, and a new request is only scheduled when the
+    consumer takes a response, so memory stays bounded however slow the Singer
+    writer is.
+    """
+
+    def __init__(self, stream: Restaurant365Stream, max_in_flight: int) -> None:
+        self.stream = stream
+        self.max_in_flight = max(1, max_in_flight)
+        self._send = stream.request_decorator(stream._request)
+        self._executor: ThreadPoolExecutor | None = None
+
+    def _fetch(self, context: dict | None, token: Any) -> requests.Response:  # noqa: ANN401
+        prepared_request = self.stream.prepare_request(context, next_page_token=token)
+        response = self._send(prepared_request, context)
+        self.stream.update_sync_costs(prepared_request, response, context)
+        return response
+
+    def __enter__(self) -> RequestEngine:
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_in_flight,
+            thread_name_prefix=f"{self.stream.name}-requests",
+        )
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:  # noqa: ANN401
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+    def submit(self, context: dict | None, token: Any) -> Future:  # noqa: ANN401
+        """Schedule a request and return its future."""
+        return self._executor.submit(self._fetch, context, token)
+
+    def fetch(self, context: dict | None, token: Any) -> requests.Response:  # noqa: ANN401
+        """Send a single request and wait for its response."""
+        return self.submit(context, token).result()
+
+    def fetch_ordered(
+        self, plan: Iterable[tuple[dict | None, Any]]
+    ) -> Iterator[tuple[dict | None, Any, requests.Response]]:
+        """Fetch each ``(context, token)`` of the plan, yielding in plan order."""
+        pending: deque = deque()
+        try:
+            for context, token in plan:
+                pending.append((context, token, self.submit(context, token)))
+                if len(pending) >= self.max_in_flight:
+                    context, token, future = pending.popleft()
+                    yield context, token, future.result()
+            while pending:
+                context, token, future = pending.popleft()
+                yield context, token, future.result()
+        finally:
+            for _, _, future in pending:
+                future.cancel()
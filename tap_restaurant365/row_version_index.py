@@ -0,0 +1,64 @@
+"""Persistent index of synced transaction row versions for tap-restaurant365."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from typing import Mapping
+
+
+class RowVersionIndex:
+    """SQLite-backed map of transactionId -> last rowVersion whose details were synced.
+
+    Lets incremental runs skip the detail requests for transactions that were
+    already synced at their current version, e.g. when overlapping windows
+    return the same header again.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS row_versions ("
+            "transaction_id TEXT PRIMARY KEY, row_version INTEGER NOT NULL)"
+        )
+        self._connection.commit()
+
+    def get(self, transaction_id: str) -> int | None:
+        """Return the last synced rowVersion of a transaction, if any."""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT row_version FROM row_versions WHERE transaction_id = ?",
+                (transaction_id,),
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_synced(self, transaction_id: str, row_version: int | None) -> bool:
+        """Return True if the transaction's details were synced at this version."""
+        if row_version is None:
+            return False
+        synced_version = self.get(transaction_id)
+        return synced_version is not None and synced_version >= row_version
+
+    def update(self, row_versions: Mapping[str, int | None]) -> None:
+        """Record that the details of these transactions are synced."""
+        values = [
+            (transaction_id, row_version)
+            for transaction_id, row_version in row_versions.items()
+            if row_version is not None
+        ]
+        if not values:
+            return
+        with self._lock:
+            self._connection.executemany(
+                "INSERT INTO row_versions (transaction_id, row_version) VALUES (?, ?) "
+                "ON CONFLICT(transaction_id) DO UPDATE SET row_version = excluded.row_version",
+                values,
+            )
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._connection.close()
@@ -0,0 +1,121 @@
+"""Compact in-flight rows for high-volume tap-restaurant365 streams."""
+
+from __future__ import annotations
+
+import sys
+from collections.abc import MutableMapping
+from typing import Any, Iterable, Iterator
+
+# Marks schema fields a row does not have, so they are left out of its dict.
+MISSING = object()
+
+
+class CompactRow(MutableMapping):
+    """Row holding its values in a list ordered by a field index shared per stream.
+
+    Subclasses made by `row_class` set ``fields`` and ``index`` once per stream,
+    so a row costs one object and one list instead of a dict with its own hash
+    table. Keys outside the schema go to a small ``extra`` dict.
+    """
+
+    __slots__ = ("_values", "_extra")
+    fields: tuple[str, ...] = ()
+    index: dict[str, int] = {}
+
+    @classmethod
+    def from_pairs(cls, pairs: list[tuple[str, Any]]) -> CompactRow | dict:
+        """Build a row from decoded JSON pairs, for use as ``object_pairs_hook``.
+
+        Objects without any schema field (such as the page envelope) stay dicts.
+        """
+        index = cls.index
+        values = [MISSING] * len(index)
+        extra = None
+        matched = False
+        for key, value in pairs:
+            position = index.get(key)
+            if position is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                values[position] = value
+                matched = True
+        if not matched:
+            return dict(pairs)
+        row = cls.__new__(cls)
+        row._values = values
+        row._extra = extra
+        return row
+
+    def __getitem__(self, key: str) -> Any:  # noqa: ANN401
+        position = self.index.get(key)
+        if position is not None:
+            value = self._values[position]
+            if value is not MISSING:
+                return value
+        elif self._extra is not None and key in self._extra:
+            return self._extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:  # noqa: ANN401
+        position = self.index.get(key)
+        if position is not None:
+            self._values[position] = value
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        self[key]  # noqa: B018 - raise KeyError for absent keys
+        position = self.index.get(key)
+        if position is not None:
+            self._values[position] = MISSING
+        else:
+            del self._extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        for field, value in zip(self.fields, self._values):
+            if value is not MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        return sum(value is not MISSING for value in self._values) + len(self._extra or ())
+
+    def to_dict(self) -> dict:
+        """Return the row as a plain dict, in the stream's field order."""
+        row = {
+            field: value
+            for field, value in zip(self.fields, self._values)
+            if value is not MISSING
+        }
+        if self._extra:
+            row.update(self._extra)
+        return row
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+def row_class(name: str, fields: Iterable[str]) -> type[CompactRow]:
+    """Return a `CompactRow` class for rows with the given fields."""
+    fields = tuple(sys.intern(field) for field in fields)
+    return type(
+        name,
+        (CompactRow,),
+        {
+            "__slots__": (),
+            "fields": fields,
+            "index": {field: position for position, field in enumerate(fields)},
+        },
+    )
+
+
+def as_dict(row: Any) -> Any:  # noqa: ANN401
+    """Return compact rows as dicts, leaving anything else unchanged."""
+    if isinstance(row, CompactRow):
+        return row.to_dict()
+    return row
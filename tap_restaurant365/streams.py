@@ -3,16 +3,30 @@
 from __future__ import annotations
 
 from functools import cached_property
+import hashlib
+import math
+import statistics
 import typing as t
 from datetime import datetime, timedelta
-from typing import Any, Dict, List, Set
+from typing import Any
 
 import requests
 from dateutil import parser
 from hotglue_singer_sdk import typing as th  # JSON Schema typing helpers
-from hotglue_singer_sdk.helpers.jsonpath import extract_jsonpath
 
 from tap_restaurant365.client import Restaurant365Stream
+from tap_restaurant365.deletions import DeletionIndex
+from tap_restaurant365.odata import (
+    QueryTemplate,
+    all_of,
+    chunked,
+    eq,
+    max_terms,
+    one_of,
+)
+from tap_restaurant365.pipeline import DEFAULT_MAX_PENDING, ChildPipeline
+from tap_restaurant365.planner import Probe, SyncEstimate
+from tap_restaurant365.row_version_index import RowVersionIndex
 
 
 class LimitedTimeframeStream(Restaurant365Stream):
@@ -20,6 +34,13 @@ class LimitedTimeframeStream(Restaurant365Stream):
 
     first_successful_response = False
     twelve_hour_sync = False
+    # Transaction `type` every request of the stream is restricted to.
+    transaction_type = None
+
+    @property
+    def window_delta(self) -> timedelta:
+        """Return the time span covered by a single request."""
+        return timedelta(hours=12) if self.twelve_hour_sync else timedelta(days=self.days_delta)
 
     def get_next_page_token(
         self, response: requests.Response, previous_token: t.Optional[t.Any]
@@ -27,9 +48,8 @@ class LimitedTimeframeStream(Restaurant365Stream):
         """Return a token for identifying next page or None if no more pages."""
         # Check if pagination is enabled
         if self.paginate:
-            data = response.json()
             # Check for the presence of a next page link in the response data. nextLink is only present if there are more than 5000 records in filter response.
-            if "@odata.nextLink" in data:
+            if self.next_link(response):
                 # Increment the skip counter for pagination
                 self.skip += 5000
                 # Update the previous token if it exists
@@ -38,6 +58,9 @@ class LimitedTimeframeStream(Restaurant365Stream):
                 # Return the next page token and the updated skip value
                 return {"token": previous_token, "skip": self.skip}
             else:
+                if self.deduplicator:
+                    # Moving to the next window, forget keys from two windows ago.
+                    self.deduplicator.rotate()
                 if self.twelve_hour_sync and not self.first_successful_response:
                     self.logger.info(f"Twelve hour sync is enabled for {self.name}")
                     self.first_successful_response = True
@@ -67,8 +90,7 @@ class LimitedTimeframeStream(Restaurant365Stream):
                     and start_date.replace(tzinfo=None)
                     <= previous_token["token"].replace(tzinfo=None)
                 ):
-                    delta_time = timedelta(hours=12) if self.twelve_hour_sync else timedelta(days=self.days_delta)
-                    start_date = previous_token["token"] + delta_time
+                    start_date = previous_token["token"] + self.window_delta
                 next_token = start_date.replace(tzinfo=None)
 
                 # Disable pagination if the next token's date is in the future
@@ -80,41 +102,131 @@ class LimitedTimeframeStream(Restaurant365Stream):
             # Return None if pagination is not enabled
             return None
 
+    def build_query_template(self) -> QueryTemplate:
+        """Return the windowed query template, ordered by the replication key."""
+        return QueryTemplate(
+            range_key=self.replication_key,
+            bounded=True,
+            filters=[eq("type", self.transaction_type) if self.transaction_type else None],
+            orderby=self.replication_key,
+        )
+
     def get_url_params(
         self,
         context: dict | None,  # noqa: ARG002
         next_page_token: Any | None,  # noqa: ANN401
     ) -> dict[str, Any]:
 
-        params: dict = {}
         token_date = None
+        end_date = None
         skip = 0
         if next_page_token:
             token_date, skip = next_page_token["token"], next_page_token["skip"]
+            end_date = next_page_token.get("end")
         start_date = token_date or self.get_starting_time(context)
-        delta_time = timedelta(hours=12) if self.twelve_hour_sync else timedelta(days=self.days_delta)
-        end_date = start_date + delta_time
-        if self.replication_key:
-            params[
-                "$filter"
-            ] = f"{self.replication_key} ge {start_date.strftime('%Y-%m-%dT%H:%M:%SZ')} and {self.replication_key} lt {end_date.strftime('%Y-%m-%dT%H:%M:%SZ')}"
-            # Order by replication key so the response is consistent
-            params["$orderby"] = f"{self.replication_key}"
-        if self.name == "journal_entries":
-            # set a date in the stream to check later to see if we need to keep calling to the stream
-            params["$filter"] += f" and type eq 'Journal Entry'"
-        if self.name == "bills":
-            params["$filter"] += f" and type eq 'AP Invoice'"
-        if self.name == "credit_memos":
-            params["$filter"] += f" and type eq 'AP Credit Memo'"
-        if self.name == "stock_count":
-            params["$filter"] += f" and type eq 'Stock Count'"
-        if self.name == "bank_expenses":
-            params["$filter"] += f" and type eq 'Bank Expense'"
-        #
-        if skip > 0:
-            params["$skip"] = skip
-        return params
+        end_date = end_date or start_date + self.window_delta
+        return self.query_template.params(
+            start_date, end_date, skip, extra=self.get_filter_chunk(next_page_token)
+        )
+
+    @property
+    def requires_request_plan(self) -> bool:
+        """Freshness-first syncs and chunked filters always follow the plan."""
+        return bool(
+            self.filter_chunks
+            or (self.replication_key and self.config.get("freshness_first_days"))
+        )
+
+    @property
+    def checkpoint_pages(self) -> bool:
+        """Windowed streams keep their progress in their own window state."""
+        return False
+
+    def get_request_plan(
+        self, context: dict | None
+    ) -> t.Iterator[tuple[dict | None, dict]] | None:
+        """Plan one request per window, from the starting time up to now."""
+        if not self.replication_key:
+            return None
+        if self.config.get("freshness_first_days"):
+            return self._iter_freshness_first_tokens(context)
+        return self._iter_window_tokens(context)
+
+    def _iter_freshness_first_tokens(
+        self, context: dict | None
+    ) -> t.Iterator[tuple[dict | None, dict]]:
+        """Plan the most recent windows first, then backfill the gap behind them.
+
+        The gap is kept in the stream state as `backfill` and shrinks as tail
+        windows complete, so an interrupted run resumes both cursors.
+        """
+        state = self.get_context_state(context)
+        start_date = self.get_starting_time(context).replace(tzinfo=None)
+        backfill = state.get("backfill")
+        if backfill is None:
+            head_start = datetime.today() - timedelta(
+                days=self.config["freshness_first_days"]
+            )
+            if head_start > start_date:
+                backfill = state["backfill"] = {
+                    "start": start_date.isoformat(),
+                    "end": head_start.isoformat(),
+                }
+        head_start = start_date
+        if backfill:
+            head_start = max(start_date, parser.parse(backfill["end"]))
+            self.logger.info(
+                f"Syncing {self.name} from {head_start} first, "
+                f"then backfilling {backfill['start']} to {backfill['end']}."
+            )
+        yield from self._iter_window_tokens(context, head_start, phase="head")
+        if backfill:
+            yield from self._iter_window_tokens(
+                context,
+                parser.parse(backfill["start"]),
+                parser.parse(backfill["end"]),
+                phase="tail",
+            )
+
+    def get_dry_run_plan(
+        self, context: dict | None
+    ) -> t.Iterable[tuple[dict | None, t.Any]]:
+        """Plan every window in order, leaving the freshness-first state alone."""
+        if not self.replication_key:
+            return super().get_dry_run_plan(context)
+        return self._split_by_filter_chunks(self._iter_window_tokens(context))
+
+    def finish_window(self, context: dict | None, next_page_token: t.Any) -> None:
+        """Move the head or tail cursor of a freshness-first sync."""
+        super().finish_window(context, next_page_token)
+        phase = (next_page_token or {}).get("phase")
+        if not phase:
+            return
+        state = self.get_context_state(context)
+        if phase == "head":
+            # Persist head progress (and keep it as the floor of the progress
+            # markers) so older tail records never move the bookmark back.
+            progress = state.setdefault("progress_markers", {})
+            values = [
+                value
+                for value in (
+                    progress.get("replication_key_value"),
+                    state.get("replication_key_value"),
+                )
+                if value
+            ]
+            if values:
+                latest = max(values, key=lambda value: parser.parse(value).replace(tzinfo=None))
+                for markers in (state, progress):
+                    markers["replication_key"] = self.replication_key
+                    markers["replication_key_value"] = latest
+        elif "backfill" in state:
+            window_end = next_page_token["end"]
+            if window_end >= parser.parse(state["backfill"]["end"]):
+                state.pop("backfill")
+            else:
+                state["backfill"]["start"] = window_end.isoformat()
+        self._write_state_message()
 
 
 class AccountsStream(Restaurant365Stream):
@@ -187,48 +299,7 @@ class BillsStream(TransactionsParentStream):
 
     name = "bills"
     path = "/Transaction"  # ?$filter=type eq 'AP Invoices'
-
-    def get_available_filters_metadata(self) -> Dict[str, Any]:
-        return {
-            "supported_operators": [],
-            "supports_nesting_clauses": False,
-            "filters": {
-                "vendors": {
-                    "label": "Vendor Name (ID)",
-                    "supported_operators": ["IN", "EQ"],
-                    "target_field": "companyId",
-                    "options": "reference_data.vendors.name_companyId",
-                }
-            },
-        }
-    
-    def setup_selected_filters(self) -> None:
-        if not self._selected_filters:
-            return
-        company_ids: List[str] = []
-        clause = self._selected_filters.get("clause_1", {})
-        operator = str(clause.get("operator", "")).upper()
-        value = clause.get("value")
-        if operator == "EQ" and value is not None:
-            company_ids.append(value.rsplit("(", 1)[-1].rstrip(")"))
-        elif operator == "IN":
-           company_ids.extend(v.rsplit("(", 1)[-1].rstrip(")") for v in value) 
-        self._vendor_company_ids = company_ids
-
-    def get_url_params(
-        self,
-        context: dict | None,
-        next_page_token: Any | None,
-    ) -> dict[str, Any]:
-        params = super().get_url_params(context, next_page_token)
-        company_ids = getattr(self, "_vendor_company_ids", None)
-        if company_ids:
-            if len(company_ids) == 1:
-                params["$filter"] += f" and companyId eq {company_ids[0]}"
-            else:
-                parts = " or ".join(f"companyId eq {cid}" for cid in company_ids)
-                params["$filter"] += f" and ({parts})"
-        return params
+    transaction_type = "AP Invoice"
 
 
 class JournalEntriesStream(TransactionsParentStream):
@@ -236,6 +307,7 @@ class JournalEntriesStream(TransactionsParentStream):
 
     name = "journal_entries"
     path = "/Transaction"  # ?$filter=type eq 'Journal Entry and modifiedOn ge '
+    transaction_type = "Journal Entry"
 
 
 class CreditMemosStream(TransactionsParentStream):
@@ -243,6 +315,7 @@ class CreditMemosStream(TransactionsParentStream):
 
     name = "credit_memos"
     path = "/Transaction"  # ?$filter=type eq 'AP Credit memo and modifiedOn ge '
+    transaction_type = "AP Credit Memo"
 
 
 class StockCountStream(TransactionsParentStream):
@@ -250,6 +323,7 @@ class StockCountStream(TransactionsParentStream):
 
     name = "stock_count"
     path = "/Transaction"  # ?$filter=type eq 'Stock Count and modifiedOn ge '
+    transaction_type = "Stock Count"
 
 
 class BankExpensesStream(TransactionsParentStream):
@@ -257,6 +331,7 @@ class BankExpensesStream(TransactionsParentStream):
  
     name = "bank_expenses"
     path = "/Transaction"  # ?$filter=type eq 'Bank Expense and modifiedOn ge '
+    transaction_type = "Bank Expense"
 
 
 class VendorsStream(Restaurant365Stream):
@@ -277,28 +352,6 @@ class VendorsStream(Restaurant365Stream):
         th.Property("modifiedOn", th.DateTimeType),
     ).to_dict()
 
-    def get_available_filters_reference_data(
-        self, fields_to_include: Set[str]
-    ) -> List[Dict[str, Any]]:
-        vendors = []
-        url = f"{self.url_base}/Company"
-        params = {"$orderby": "name"}
-        while url:
-            prepared_request = self.build_prepared_request("GET", url, params=params)
-            response = self.request_decorator(self._request)(prepared_request, None)
-            data = response.json()
-            vendors.extend(data.get("value", []))
-            url = data.get("@odata.nextLink")
-            params = None  # nextLink URL already includes query params
-
-        return [
-            {
-                "companyId": vendor["companyId"],
-                "name": vendor["name"],
-                "name_companyId": f"{vendor['name']} ({vendor['companyId']})",
-            }
-            for vendor in vendors
-        ]
 
 class ItemsStream(Restaurant365Stream):
     """Define custom stream."""
@@ -469,6 +522,8 @@ class SalesEmployeeStream(LimitedTimeframeStream):
     replication_key = "modifiedOn"
     twelve_hour_sync = True
     paginate = True
+    # Location ID column of the sales views.
+    pushdown_fields = {"locations": "location"}
     schema = th.PropertiesList(
         th.Property("salesId", th.StringType),
         th.Property("receiptNumber", th.StringType),
@@ -507,6 +562,9 @@ class SalesDetailStream(LimitedTimeframeStream):
     replication_key = "modifiedOn"
     twelve_hour_sync = True
     paginate = True
+    compact_rows = True
+    # Location ID column of the sales views.
+    pushdown_fields = {"locations": "location"}
     schema = th.PropertiesList(
         th.Property("salesdetailID", th.StringType),
         th.Property("menuitem", th.StringType),
@@ -540,6 +598,8 @@ class SalesPaymentStream(LimitedTimeframeStream):
     replication_key = "modifiedOn"
     twelve_hour_sync = True
     paginate = True
+    # Location ID column of the sales views.
+    pushdown_fields = {"locations": "location"}
     schema = th.PropertiesList(
         th.Property("salespaymentId", th.StringType),
         th.Property("name", th.StringType),
@@ -579,55 +639,148 @@ class EntityDeletedStream(Restaurant365Stream):
         th.Property("deletedOn", th.DateTimeType),
         th.Property("rowVersion", th.IntegerType),
     ).to_dict()
+    accepts_tombstones = False
+
+    @cached_property
+    def deletion_index(self) -> DeletionIndex | None:
+        if not self.config.get("propagate_deletes"):
+            return None
+        return DeletionIndex(
+            (stream.name, stream.path)
+            for stream in self._tap.streams.values()
+            if stream.accepts_tombstones
+        )
+
+    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
+        yield from super().get_records(context)
+        if self.deletion_index is not None and self.deletion_index.unresolved:
+            unresolved = ", ".join(self.deletion_index.unresolved)
+            self.logger.warning(
+                f"Deleted entities of type(s) {unresolved} match no stream keyed by "
+                "their ID and were not propagated."
+            )
+
+    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+        """Write a tombstone to the selected streams holding the deleted entity."""
+        row = super().post_process(row, context)
+        if row is None or self.deletion_index is None:
+            return row
+        for stream_name in self.deletion_index.resolve(row.get("entityName")):
+            stream = self._tap.streams[stream_name]
+            if stream.selected:
+                stream.write_tombstone(row["entityId"], row.get("deletedOn"))
+        return row
 
 
 class TransactionsStream(TransactionsParentStream):
     """Define custom stream."""
 
     name = "transaction"
-    # We get node limit exceeded for number larger than this one.
-    batch_size = 10
-    result_count = 0
+    child_pipeline = None
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self.row_version_index = None
+        # Row versions whose details were synced since the last STATE message.
+        self.synced_row_versions: dict = {}
+        if self.config.get("transaction_index_path"):
+            self.row_version_index = RowVersionIndex(self.config["transaction_index_path"])
 
     def get_child_context(self, record: dict, context: t.Optional[dict]) -> dict:
         return {}
 
-    def parse_response(self, response: requests.Response) -> t.Iterable[dict]:
-        """Parse the response and return an iterator of result records.
+    def get_child_threads(self) -> int:
+        # Details are synced by the child pipeline, not per record.
+        return 1
 
-        Args:
-            response: A raw `requests.Response`_ object.
+    @property
+    def batch_size(self) -> int:
+        """Return how many transaction IDs fit in a single detail request."""
+        return min(
+            (max_terms(base_nodes=child.base_filter_nodes) for child in self.child_streams),
+            default=max_terms(),
+        )
 
-        Yields:
-            One item for every item found in the response.
+    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
+        """Yield transactions while their details are synced in the background.
 
-        .. _requests.Response:
-            https://requests.readthedocs.io/en/latest/api/#requests.Response
+        Transaction IDs are queued as records stream by, and a worker thread
+        sends full batches to the detail stream regardless of page boundaries.
+        """
+        details_selected = any(
+            child.selected or child.has_selected_descendents for child in self.child_streams
+        )
+        # On incremental runs, skip details already synced at the same rowVersion.
+        skip_synced = (
+            self.row_version_index is not None
+            and self.get_starting_timestamp(context) is not None
+        )
+        pipeline = None
+        if details_selected and not self.replaying:
+            pipeline = ChildPipeline(
+                self._sync_detail_batch,
+                # Child detail requests for a batch run concurrently when enabled.
+                batch_size=self.batch_size * self.max_requests_in_flight,
+                max_pending=self.config.get("detail_queue_size") or DEFAULT_MAX_PENDING,
+                spool_directory=self.config.get("detail_spool_directory"),
+                name=f"{self.name}-details",
+            )
+        self.child_pipeline = pipeline
+        try:
+            for record in self.request_records(context):
+                transformed_record = self.post_process(record, context)
+                if transformed_record is None:
+                    # Record filtered out during post_process()
+                    continue
+                transaction_id = record["transactionId"]
+                row_version = record.get("rowVersion")
+                if pipeline is not None and not (
+                    skip_synced
+                    and self.row_version_index.is_synced(transaction_id, row_version)
+                ):
+                    pipeline.put(transaction_id, row_version)
+                yield transformed_record
+            if pipeline is not None:
+                pipeline.close()
+                pipeline = None
+        finally:
+            self.child_pipeline = None
+            if pipeline is not None:
+                pipeline.close(abort=True)
+
+    def estimate_sync(self, context: dict | None = None) -> list[SyncEstimate]:
+        """Estimate the transactions and the detail requests fanned out from them."""
+        probes = self.probe_units(self.get_dry_run_plan(context))
+        estimates = [self.estimate_from_probes(self.name, probes)] if self.selected else []
+        for child_stream in self.child_streams:
+            if child_stream.selected:
+                estimates.append(child_stream.estimate_fan_out(probes))
+        return estimates
+
+    def _sync_detail_batch(self, row_versions: dict) -> None:
+        self._sync_children({"transaction_ids": list(row_versions)})
+        if self.row_version_index is not None:
+            self.synced_row_versions.update(row_versions)
+
+    def _write_state_message(self) -> None:
+        if self.child_pipeline is not None:
+            # Never let the bookmark pass transactions whose details are queued.
+            self.child_pipeline.flush()
+        super()._write_state_message()
+        self._mark_details_synced()
+
+    def _mark_details_synced(self) -> None:
+        """Record synced row versions once a STATE message covers their details.
+
+        Until then a failed run restarts from the previous bookmark, and must
+        fetch those details again. The flush above leaves the worker idle.
         """
-        data = response.json()
-        if "value" in data:
-            # We cant get this number later because it breaks the generator flow.
-            self.result_count = len(data["value"])
-        yield from extract_jsonpath(self.records_jsonpath, input=data)
+        row_versions, self.synced_row_versions = self.synced_row_versions, {}
+        if self.row_version_index is None or not row_versions:
+            return
+        if any(child.selected for child in self.child_streams):
+            self.row_version_index.update(row_versions)
 
-    def get_records(self, context: dict | None) -> t.Iterable[dict[str, t.Any]]:
-        """Override the get records to call child stream once batch size is reached we have processed all of the records. ."""  # noqa: E501
-        batch_size = self.batch_size
-        current_batch = []
-        for i, record in enumerate(self.request_records(context), 1):
-            num_records = self.result_count
-            transformed_record = self.post_process(record, context)
-            if transformed_record is None:
-                # Record filtered out during post_process()
-                continue
-            current_batch.append(record["transactionId"])
-            if (
-                i % batch_size == 0 or i == num_records
-            ):  # Check if the batch is full or it's the last record
-                self._sync_children({"transaction_ids": current_batch})
-                current_batch = []
-            yield transformed_record
-        
     def _sync_children(self, child_context: dict) -> None:
         if not child_context.get("transaction_ids"):
             return
@@ -643,6 +796,9 @@ class TransactionDetailsStream(LimitedTimeframeStream):
     replication_key = None
     paginate = True
     parent_stream_type = TransactionsStream
+    compact_rows = True
+    # Leave room for at least 5 transaction IDs next to the pushed down filters.
+    request_filter_nodes = 20
     schema = th.PropertiesList(
         th.Property("transactionDetailId", th.StringType),
         th.Property("transactionId", th.StringType),
@@ -670,10 +826,9 @@ class TransactionDetailsStream(LimitedTimeframeStream):
     ) -> t.Optional[t.Any]:
         """Return a token for identifying next page or None if no more pages."""
         # Check if pagination is enabled
-        data = response.json()
         # Check for the presence of a next page link in the response data. nextLink is only present if there are more than 5000 records in filter response.
         # This is unlikely that a single transaction will have 5k records but it is possible so leaving this code part here.
-        if "@odata.nextLink" in data:
+        if self.next_link(response):
             # Increment the skip counter for pagination
             self.skip += 5000
             # Update the previous token if it exists
@@ -691,23 +846,70 @@ class TransactionDetailsStream(LimitedTimeframeStream):
         next_page_token: Any | None,  # noqa: ANN401
     ) -> dict[str, Any]:
 
-        params: dict = {}
-        token_date = None
         skip = 0
         if next_page_token:
-            token_date, skip = next_page_token["token"], next_page_token["skip"]
-        if context.get("transaction_ids"):
-            params["$filter"] = " or ".join(
-                [
-                    f"transactionId eq '{transaction_id}'"
-                    for transaction_id in context.get("transaction_ids")
-                ],
-            )
-            # Replace ' from the populated filter to avoid errors
-            params["$filter"] = params["$filter"].replace("'", "")
-        if skip > 0:
-            params["$skip"] = skip
-        return params
+            skip = next_page_token.get("skip", 0)
+        transaction_ids = context.get("transaction_ids") or []
+        return self.query_template.params(
+            skip=skip,
+            extra=all_of(
+                one_of("transactionId", transaction_ids),
+                self.get_filter_chunk(next_page_token),
+            ),
+        )
+
+    @property
+    def base_filter_nodes(self) -> int:
+        """Return the filter nodes of a request besides its transaction IDs."""
+        base_nodes = self.query_template.node_count
+        if self.filter_chunks:
+            base_nodes += max(chunk.nodes for chunk in self.filter_chunks) + 1
+        return base_nodes
+
+    @property
+    def requires_request_plan(self) -> bool:
+        """Chunk the transaction IDs whenever other filters share their request."""
+        return bool(self.base_filter_nodes)
+
+    def get_request_plan(
+        self, context: dict | None
+    ) -> t.Iterator[tuple[dict | None, dict]] | None:
+        """Plan one request per chunk of transaction IDs that fits a filter."""
+        transaction_ids = (context or {}).get("transaction_ids") or []
+        return (
+            ({**context, "transaction_ids": chunk}, None)
+            for chunk in chunked(transaction_ids, base_nodes=self.base_filter_nodes)
+        )
+
+    def estimate_fan_out(self, transaction_probes: list[Probe]) -> SyncEstimate:
+        """Estimate the detail requests for the transactions counted by the parent.
+
+        One request's worth of the sampled transactions is probed to get the
+        average number of detail rows per transaction. The rows of all
+        transactions are spread over the requests, so a last partial batch of
+        transactions only adds its own rows.
+        """
+        per_request = max_terms(base_nodes=self.base_filter_nodes)
+        transactions = sum(probe.rows for probe in transaction_probes)
+        sample_ids = [
+            probe.sample["transactionId"] for probe in transaction_probes if probe.sample
+        ][:per_request]
+        if not transactions or not sample_ids:
+            return self.estimate_from_probes(self.name, [])
+        probes = self.probe_units(
+            self.get_dry_run_plan({"transaction_ids": sample_ids})
+        )
+        rows_per_transaction = sum(probe.rows for probe in probes) / len(sample_ids)
+        rows = round(rows_per_transaction * transactions)
+        requests = math.ceil(transactions / per_request) * len(probes)
+        sample = next((probe.sample for probe in probes if probe.sample), None)
+        latency = statistics.median(probe.seconds for probe in probes)
+        rows_per_request, remainder = divmod(rows, requests)
+        units = [
+            Probe(rows_per_request + (unit < remainder), sample, latency)
+            for unit in range(requests)
+        ]
+        return self.estimate_from_probes(self.name, units)
 
 
 class PayrollSummaryStream(LimitedTimeframeStream):
@@ -715,10 +917,25 @@ class PayrollSummaryStream(LimitedTimeframeStream):
 
     name = "payroll_summary"
     path = "/PayrollSummary"
-    primary_keys = None
-    replication_key = None
+    primary_keys = ["payrollSummaryKey"]
+    replication_key = "payrollEnd"
+    paginate = True
+    pagination_start = None
     pagination_date = None
+    # Longest pay period seen so far, in days. Windows are sized to it so that
+    # each request holds one period end per pay schedule.
+    period_days = None
+    # Fields identifying a payroll summary row, hashed into payrollSummaryKey.
+    key_fields = [
+        "employeeID",
+        "location",
+        "jobCode",
+        "payRate",
+        "payrollStart",
+        "payrollEnd",
+    ]
     schema = th.PropertiesList(
+        th.Property("payrollSummaryKey", th.StringType),
         th.Property("employeeID", th.StringType),
         th.Property("location", th.StringType),
         th.Property("locationNumber", th.StringType),
@@ -737,16 +954,38 @@ class PayrollSummaryStream(LimitedTimeframeStream):
         th.Property("payrollStart", th.DateTimeType),
         th.Property("payrollEnd", th.DateTimeType),
     ).to_dict()
+
+    def build_query_template(self) -> QueryTemplate:
+        """Return the windowed query template, always ranged on `payrollEnd`.
+
+        Windows must stay filtered even for catalogs that sync the stream as
+        FULL_TABLE, without a replication key.
+        """
+        return QueryTemplate(range_key="payrollEnd", bounded=True, orderby="payrollEnd")
+
+    @property
+    def window_delta(self) -> timedelta:
+        """Return the window size, one pay period once a period has been seen."""
+        return timedelta(days=self.period_days or self.days_delta)
+
+    def get_starting_time(self, context):
+        """Start from the bookmark minus a lookback for late processed payrolls."""
+        start_date = super().get_starting_time(context)
+        if self.get_starting_timestamp(context):
+            lookback_days = self.config.get("payroll_lookback_days", 14)
+            start_date = start_date - timedelta(days=lookback_days)
+        return start_date
+
     def get_next_page_token(
         self, response: requests.Response, previous_token: t.Optional[t.Any]
     ) -> t.Optional[t.Any]:
         """
         Return a token for identifying next page or None if no more pages.
 
-        The token is a datetime object that is used to filter the next page
-        of results. The token is calculated by adding the days_delta
-        parameter to the previous token. If the new token is in the future,
-        the pagination is disabled.
+        Windows are non-overlapping ranges of `payrollEnd`, so each pay period
+        is requested exactly once. The next window starts where the previous
+        one ended and is sized from the pay periods seen so far. Pagination
+        stops once the next window starts in the future.
 
         Args:
             response: The response object from the latest request.
@@ -756,34 +995,37 @@ class PayrollSummaryStream(LimitedTimeframeStream):
         Returns:
             A token for the next page, or None if no more pages are available.
         """
+        next_token = self.get_next_page_token_in_window(response, previous_token)
+        if next_token:
+            # Stay in the window of this request, the first one has no token.
+            return {**next_token, "token": self.pagination_start, "end": self.pagination_date}
+
         today = datetime.today()  # noqa: DTZ002
-        if self.pagination_date:
-            previous_token = self.pagination_date
-        if isinstance(previous_token,str):
-            previous_token = parser.parse(previous_token)
-        # Add a day to previous token
-        next_token = previous_token + timedelta(days=1)
-        next_token = next_token.replace(tzinfo=None)
-
-        # Disable pagination if the next token's date is in the future
-        if (today - next_token).days < 0:
+        next_start = self.pagination_date.replace(tzinfo=None)
+        if next_start > today:
             return None
-        # Return the next token and the current skip value
-        return next_token
-        
-    
+        return {"token": next_start, "skip": 0, "end": next_start + self.window_delta}
+
     def get_url_params(
         self,
         context: dict | None,  # noqa: ARG002
         next_page_token: Any | None,  # noqa: ANN401
     ) -> dict[str, Any]:
 
-        params: dict = {}
-        token_date = None
+        start_date, skip = self.get_starting_time(context), 0
+        end_date = None
         if next_page_token:
-            token_date = next_page_token
-        start_date = token_date or self.get_starting_time(context)
-        end_date = start_date + timedelta(days=self.days_delta)
+            start_date, skip = next_page_token["token"], next_page_token["skip"]
+            end_date = next_page_token.get("end")
+        end_date = end_date or start_date + self.window_delta
+        self.pagination_start = start_date
         self.pagination_date = end_date
-        params["$filter"] = f"payrollStart ge {start_date.strftime('%Y-%m-%dT%H:%M:%SZ')} and payrollEnd le {end_date.strftime('%Y-%m-%dT23:59:59Z')}"
-        return params
+        return self.query_template.params(start_date, end_date, skip)
+
+    def post_process(self, row: dict, context: dict | None = None) -> dict | None:
+        key = "|".join(str(row.get(field)) for field in self.key_fields)
+        row["payrollSummaryKey"] = hashlib.md5(key.encode()).hexdigest()  # noqa: S324
+        if row.get("payrollStart") and row.get("payrollEnd"):
+            period = parser.parse(row["payrollEnd"]) - parser.parse(row["payrollStart"])
+            self.period_days = max(self.period_days or 1, period.days + 1)
+        return super().post_process(row, context)
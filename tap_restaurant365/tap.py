@@ -2,17 +2,26 @@
 
 from __future__ import annotations
 
+import json
+import sys
+from typing import Any, Callable
+
+import click
 from hotglue_singer_sdk import Tap
 from hotglue_singer_sdk import typing as th  # JSON schema typing helpers
+from hotglue_singer_sdk.helpers._classproperty import classproperty
 
 # TODO: Import your custom stream types here:
 from tap_restaurant365 import streams
+from tap_restaurant365.planner import total
 
 
 class TapRestaurant365(Tap):
     """Restaurant365 tap class."""
 
     name = "tap-restaurant365"
+    # Set by `--plan`: estimate the sync instead of running it.
+    plan_only = False
 
     # TODO: Update this section with the actual config values you expect:
     config_jsonschema = th.PropertiesList(
@@ -39,8 +48,168 @@ class TapRestaurant365(Tap):
             th.DateTimeType,
             description="The earliest record date to sync",
         ),
+        th.Property(
+            "deduplicate_records",
+            th.BooleanType,
+            default=False,
+            description="Drop records already emitted in this run (same primary key and modifiedOn)",
+        ),
+        th.Property(
+            "deduplication_max_keys",
+            th.IntegerType,
+            default=1000000,
+            description="Maximum number of record keys kept per stream for deduplication",
+        ),
+        th.Property(
+            "max_requests_in_flight",
+            th.IntegerType,
+            default=1,
+            description="Number of requests a stream may keep running concurrently (windows and transaction detail batches)",
+        ),
+        th.Property(
+            "prefetch_pages",
+            th.IntegerType,
+            default=0,
+            description="Number of pages fetched in the background ahead of the page being processed",
+        ),
+        th.Property(
+            "payroll_lookback_days",
+            th.IntegerType,
+            default=14,
+            description="Days before the payroll_summary bookmark to re-check for payrolls processed late",
+        ),
+        th.Property(
+            "transaction_index_path",
+            th.StringType,
+            description="Path of a local SQLite file tracking synced transaction rowVersions, used to skip unchanged transaction details",
+        ),
+        th.Property(
+            "detail_queue_size",
+            th.IntegerType,
+            default=10000,
+            description="Maximum number of transaction IDs held in memory while waiting for their details to be synced",
+        ),
+        th.Property(
+            "detail_spool_directory",
+            th.StringType,
+            description="Directory where transaction IDs beyond detail_queue_size are spooled instead of pausing the transaction stream",
+        ),
+        th.Property(
+            "batch_streams",
+            th.ArrayType(th.StringType),
+            description="Streams written as batch files announced by BATCH messages instead of RECORD messages ('*' for all)",
+        ),
+        th.Property(
+            "batch_format",
+            th.StringType,
+            default="jsonl",
+            description="Batch file format: 'jsonl' (gzip compressed) or 'parquet' (requires pyarrow)",
+        ),
+        th.Property(
+            "batch_directory",
+            th.StringType,
+            default="output",
+            description="Directory batch files are written to",
+        ),
+        th.Property(
+            "batch_max_records",
+            th.IntegerType,
+            default=100000,
+            description="Maximum number of records per batch file",
+        ),
+        th.Property(
+            "archive_directory",
+            th.StringType,
+            description="Directory raw response pages are archived to (zstd compressed if zstandard is installed, zlib otherwise)",
+        ),
+        th.Property(
+            "replay_archive",
+            th.BooleanType,
+            default=False,
+            description="Re-emit records from the pages in archive_directory instead of requesting the API",
+        ),
+        th.Property(
+            "adaptive_timeouts",
+            th.BooleanType,
+            default=False,
+            description="Derive request timeouts from each endpoint's observed p99 latency (capped at 60 seconds)",
+        ),
+        th.Property(
+            "hedge_requests",
+            th.BooleanType,
+            default=False,
+            description="Send a duplicate request when a request runs longer than the endpoint's p95 latency and use the first response",
+        ),
+        th.Property(
+            "window_days",
+            th.NumberType,
+            description="Split the syncs of non-windowed streams (accounts, employees, labor_detail, ...) into windows of this many days",
+        ),
+        th.Property(
+            "freshness_first_days",
+            th.NumberType,
+            description="Sync the most recent days of windowed streams first, then backfill older windows",
+        ),
+        th.Property(
+            "propagate_deletes",
+            th.BooleanType,
+            default=False,
+            description="Write entity_deleted rows as records with _sdc_deleted_at to the streams the deleted entities belong to",
+        ),
     ).to_dict()
 
+    @classproperty
+    def cli(cls) -> Callable:
+        """Execute the standard CLI handler, with a `--plan` dry run."""
+        command = Tap.__dict__["cli"].fget(cls)
+        command.params.append(
+            click.Option(
+                ["--plan"],
+                is_flag=True,
+                help="Estimate the requests, rows, bytes and time of a sync without running it.",
+            )
+        )
+        callback = command.callback
+
+        def run(plan: bool = False, **options: Any) -> None:  # noqa: ANN401
+            cls.plan_only = plan
+            callback(**options)
+
+        command.callback = run
+        return command
+
+    def run_sync(self, catalog: Any = None, state: Any = None) -> None:  # noqa: ANN401
+        if not self.plan_only:
+            super().run_sync(catalog=catalog, state=state)
+            return
+        self.register_streams_from_catalog(catalog)
+        self.register_state_from_file(state)
+        self.run_plan()
+
+    def run_plan(self) -> None:
+        """Write the estimated cost of syncing the selected streams as JSON.
+
+        Every planned window (or batch) is counted with a `$count` probe,
+        without fetching its records.
+        """
+        self._prepare_state_and_replication_methods()
+        estimates = []
+        for stream in self.streams.values():
+            if not stream.selected and not stream.has_selected_descendents:
+                continue
+            if stream.parent_stream_type:
+                # Estimated together with the parent stream.
+                continue
+            stream._write_starting_replication_value(None)
+            self.logger.info(f"Estimating the sync of '{stream.name}'...")
+            estimates.extend(stream.estimate_sync())
+        payload = {
+            "streams": [estimate.to_dict() for estimate in estimates],
+            "total": total(estimates).to_dict(),
+        }
+        sys.stdout.write(json.dumps(payload, indent=2) + "\n")
+        sys.stdout.flush()
+
     def discover_streams(self) -> list[streams.Restaurant365Stream]:
         """Return a list of discovered streams.
 
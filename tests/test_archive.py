@@ -0,0 +1,18 @@
+"""Tests for the raw page archive."""
+
+from tap_restaurant365.archive import PageArchive
+
+
+def test_pages_are_replayed_in_order_with_latest_copy(tmp_path):
+    archive = PageArchive(str(tmp_path), codec="zlib")
+    archive.append("sales_detail", "/SalesDetail?$skip=0", b'{"value": [1]}')
+    archive.append("sales_detail", "/SalesDetail?$skip=5000", b'{"value": [2]}')
+    archive.append("sales_detail", "/SalesDetail?$skip=0", b'{"value": [3]}')
+    archive.append("accounts", "/GLAccount", b'{"value": []}')
+
+    reopened = PageArchive(str(tmp_path))
+    assert list(reopened.pages("sales_detail")) == [
+        ("/SalesDetail?$skip=5000", b'{"value": [2]}'),
+        ("/SalesDetail?$skip=0", b'{"value": [3]}'),
+    ]
+    assert list(reopened.pages("payroll_summary")) == []
@@ -0,0 +1,77 @@
+"""Tests for batch file output."""
+
+import gzip
+import json
+
+from tap_restaurant365.batch import BatchWriter
+from tap_restaurant365.tap import TapRestaurant365
+from tests.test_streams import CONFIG, fake_api, make_tap
+
+SCHEMA = {"properties": {"id": {"type": ["string"]}, "amount": {"type": ["number"]}}}
+
+
+def read_messages(capsys):
+    return [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+
+
+def read_batch(message):
+    with gzip.open(message["filepath"], "rt") as handle:
+        return [json.loads(line) for line in handle]
+
+
+def test_full_batches_are_announced_and_flush_closes_the_rest(tmp_path, capsys):
+    writer = BatchWriter(SCHEMA, str(tmp_path), max_records=2)
+    for i in range(3):
+        writer.write("sales", {"id": f"s{i}", "amount": i})
+    (full,) = read_messages(capsys)
+    assert full["type"] == "BATCH" and full["stream"] == "sales"
+    assert full["format"] == "jsonl" and full["compression"] == "gzip"
+    assert full["batch_size"] == 2
+    assert read_batch(full) == [{"id": "s0", "amount": 0}, {"id": "s1", "amount": 1}]
+
+    writer.flush()
+    (rest,) = read_messages(capsys)
+    assert rest["batch_size"] == 1 and read_batch(rest) == [{"id": "s2", "amount": 2}]
+    assert rest["filepath"] != full["filepath"]
+    writer.flush()
+    assert read_messages(capsys) == []
+
+
+def test_batches_are_flushed_before_state(tmp_path, capsys):
+    tap = make_tap(
+        start_date="2024-01-01T00:00:00Z",
+        batch_streams=["accounts"],
+        batch_directory=str(tmp_path),
+    )
+    stream = tap.streams["accounts"]
+    fake_api(
+        stream,
+        lambda params: {
+            "value": [
+                {"glAccountId": f"a{i}", "modifiedOn": "2024-01-02T00:00:00Z"} for i in range(3)
+            ]
+        },
+    )
+    stream.sync()
+    messages = [m for m in read_messages(capsys) if m["type"] in ("BATCH", "RECORD", "STATE")]
+    assert [m["type"] for m in messages] == ["BATCH", "STATE"]
+    assert [row["glAccountId"] for row in read_batch(messages[0])] == ["a0", "a1", "a2"]
+
+
+def test_batch_schema_follows_the_catalog_selection(tmp_path):
+    catalog = make_tap().catalog_dict
+    for entry in catalog["streams"]:
+        for metadata in entry["metadata"]:
+            if entry["tap_stream_id"] == "accounts" and metadata["breadcrumb"] in (
+                [],
+                ["properties", "glType"],
+            ):
+                metadata["metadata"]["selected"] = metadata["breadcrumb"] == []
+    tap = TapRestaurant365(
+        config={**CONFIG, "batch_streams": ["*"], "batch_directory": str(tmp_path)},
+        catalog=catalog,
+        parse_env_config=False,
+    )
+    properties = tap.streams["accounts"].batch_writer.schema["properties"]
+    assert "glAccountId" in properties
+    assert "glType" not in properties
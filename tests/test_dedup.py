@@ -0,0 +1,17 @@
+"""Tests for the record deduplicator."""
+
+from tap_restaurant365.dedup import RecordDeduplicator
+
+
+def test_repeats_are_flagged_until_evicted():
+    dedup = RecordDeduplicator(["transactionDetailId", "rowType"], max_keys=4)
+    record = {"transactionDetailId": "a", "rowType": "Debit", "modifiedOn": "2024-01-01"}
+    assert not dedup.seen(record)
+    assert dedup.seen(dict(record))
+    # A newer version of the same row is not a duplicate.
+    assert not dedup.seen(dict(record, modifiedOn="2024-01-02"))
+    dedup.rotate()
+    assert dedup.seen(record)
+    dedup.rotate()
+    assert not dedup.seen(record)
+    assert dedup.duplicates == 2
@@ -0,0 +1,39 @@
+"""Tests for deleted entity propagation."""
+
+from tap_restaurant365.deletions import DELETED_AT, DeletionIndex, tombstone
+from tap_restaurant365.tap import TapRestaurant365
+
+STREAMS = [
+    ("transaction", "/Transaction"),
+    ("bills", "/Transaction"),
+    ("transaction_detail", "/TransactionDetail"),
+    ("vendors", "/Company"),
+]
+
+
+def test_entities_resolve_by_stream_name_before_endpoint():
+    index = DeletionIndex(STREAMS)
+    # Not the typed transaction streams sharing the endpoint.
+    assert index.resolve("Transaction") == ("transaction",)
+    assert index.resolve("Transaction Detail") == ("transaction_detail",)
+    assert index.resolve("company") == ("vendors",)
+    assert index.resolve("Widget") == ()
+    assert index.unresolved == ["Widget"]
+
+
+def test_tombstone_holds_key_and_deletion_time():
+    record = tombstone("transactionId", "t1", "2026-10-18T01:00:00Z")
+    assert record == {"transactionId": "t1", DELETED_AT: "2026-10-18T01:00:00Z"}
+
+
+def test_composite_key_streams_get_no_tombstones():
+    tap = TapRestaurant365(
+        config={"username": "u", "password": "p", "store_name": "s", "propagate_deletes": True},
+        parse_env_config=False,
+    )
+    index = tap.streams["entity_deleted"].deletion_index
+    assert index.resolve("Transaction") == ("transaction",)
+    # A deletion's ID alone does not identify a detail row (keyed with rowType).
+    assert index.resolve("TransactionDetail") == ()
+    assert DELETED_AT in tap.streams["transaction"].schema["properties"]
+    assert DELETED_AT not in tap.streams["transaction_detail"].schema["properties"]
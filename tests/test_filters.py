@@ -0,0 +1,24 @@
+"""Tests for the filter pushdown helpers."""
+
+from tap_restaurant365.filters import find_filter_fields, selected_values
+
+
+def test_filter_columns_match_naming_variants():
+    assert find_filter_fields(["laborId", "location_ID", "location"]) == {
+        "locations": "location_ID"
+    }
+    assert find_filter_fields(["companyId", "locationId", "glAccountId"]) == {
+        "vendors": "companyId",
+        "locations": "locationId",
+        "gl_accounts": "glAccountId",
+    }
+
+
+def test_selected_values_extract_option_ids():
+    assert selected_values(
+        {"field": "vendors", "operator": "EQ", "value": "Acme (Corp) (12345)"}
+    ) == ["12345"]
+    assert selected_values(
+        {"field": "locations", "operator": "in", "value": ["A (1)", "B (2)"]}
+    ) == ["1", "2"]
+    assert selected_values({"field": "locations", "operator": "GT", "value": "A (1)"}) == []
@@ -0,0 +1,22 @@
+"""Tests for the request latency histograms."""
+
+from tap_restaurant365.latency import LatencyHistogram, LatencyTracker
+
+
+def test_quantiles_are_within_bucket_accuracy():
+    histogram = LatencyHistogram()
+    for millis in range(1, 1001):
+        histogram.record(millis / 100)
+    assert 4.9 <= histogram.quantile(0.5) <= 5.5
+    assert 9.8 <= histogram.quantile(0.99) <= 11
+
+
+def test_tracker_needs_enough_samples_per_path():
+    tracker = LatencyTracker(min_samples=3)
+    tracker.record("/SalesDetail", 1.0)
+    tracker.record("/SalesDetail", 2.0)
+    tracker.record("/TransactionDetail", 30.0)
+    assert tracker.quantile("/SalesDetail", 0.99) is None
+    tracker.record("/SalesDetail", 2.0)
+    assert 2 <= tracker.quantile("/SalesDetail", 0.99) <= 2.2
+    assert tracker.quantile("/TransactionDetail", 0.99) is None
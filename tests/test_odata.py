@@ -0,0 +1,47 @@
+"""Tests for the OData query builder."""
+
+from datetime import datetime
+
+from tap_restaurant365.odata import (
+    QueryTemplate,
+    chunked,
+    eq,
+    literal,
+    max_terms,
+    one_of,
+)
+
+GUID = "0b7f6c3e-5a1d-4c7e-9f2a-1e2d3c4b5a69"
+
+
+def test_literal_quoting():
+    assert literal("O'Brien") == "'O''Brien'"
+    assert literal(GUID) == GUID
+    assert literal(True) == "true"
+    assert literal(datetime(2024, 1, 2, 3, 4, 5)) == "2024-01-02T03:04:05Z"
+
+
+def test_template_renders_window_and_static_filters():
+    template = QueryTemplate(
+        range_key="modifiedOn",
+        bounded=True,
+        filters=[eq("type", "AP Invoice")],
+        orderby="modifiedOn",
+    )
+    params = template.params(datetime(2024, 1, 1), datetime(2024, 1, 11), skip=5000)
+    assert params == {
+        "$orderby": "modifiedOn",
+        "$filter": "modifiedOn ge 2024-01-01T00:00:00Z"
+        " and modifiedOn lt 2024-01-11T00:00:00Z and type eq 'AP Invoice'",
+        "$skip": 5000,
+    }
+    extended = template.extend(one_of("companyId", [GUID, GUID]))
+    assert extended.params(datetime(2024, 1, 1))["$filter"].endswith(
+        f"and (companyId eq {GUID} or companyId eq {GUID})"
+    )
+
+
+def test_node_budget_sizes_batches():
+    assert max_terms() == 10
+    assert one_of("transactionId", [GUID] * 10).nodes == 39
+    assert [len(chunk) for chunk in chunked(range(25))] == [10, 10, 5]
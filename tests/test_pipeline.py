@@ -0,0 +1,41 @@
+"""Tests for the background child pipeline."""
+
+import os
+
+import pytest
+
+from tap_restaurant365.pipeline import ChildPipeline, SpoolQueue
+
+
+def test_spooled_items_come_back_in_order(tmp_path):
+    spool = SpoolQueue(2, spool_directory=str(tmp_path))
+    for item in range(5):
+        spool.put([item, None])
+    assert [spool.get()[0] for _ in range(3)] == [0, 1, 2]
+    spool.put([5, None])
+    assert [spool.get()[0] for _ in range(3)] == [3, 4, 5]
+    spool.close()
+    assert os.listdir(tmp_path) == []
+
+
+def test_batches_span_puts_and_flush_syncs_the_rest():
+    batches = []
+    pipeline = ChildPipeline(lambda batch: batches.append(dict(batch)), batch_size=3)
+    for key in "abcde":
+        pipeline.put(key, 1)
+    pipeline.flush()
+    assert batches == [{"a": 1, "b": 1, "c": 1}, {"d": 1, "e": 1}]
+    pipeline.put("f")
+    pipeline.close()
+    assert batches[-1] == {"f": None}
+
+
+def test_worker_errors_are_raised_in_the_parent():
+    def fail(batch):
+        raise RuntimeError("detail request failed")
+
+    pipeline = ChildPipeline(fail, batch_size=1)
+    pipeline.put("a")
+    with pytest.raises(RuntimeError):
+        pipeline.flush()
+    pipeline.close(abort=True)
@@ -0,0 +1,48 @@
+"""Tests for dry-run sync estimates."""
+
+import pytest
+
+from tap_restaurant365.planner import Probe, estimate, total
+from tap_restaurant365.tap import TapRestaurant365
+
+
+def test_estimate_counts_a_request_per_page_of_each_unit():
+    probes = [Probe(12000, {"id": "a"}, 0.5), Probe(0, None, 0.5)]
+    result = estimate(
+        "sales_detail", probes, concurrency=2, page_size=5000, throughput=1000, window_days=0.5
+    )
+    assert (result.units, result.requests, result.rows) == (2, 4, 12000)
+    assert result.bytes == 12000 * len('{"id": "a"}')
+    assert result.seconds == pytest.approx((4 * 0.5 + result.bytes / 1000) / 2)
+    assert result.suggested_window_days == pytest.approx(0.42)
+
+
+def test_total_sums_streams():
+    first = estimate("a", [Probe(10, None, 1.0)], concurrency=1, page_size=5000)
+    second = estimate("b", [Probe(6000, None, 1.0)], concurrency=1, page_size=5000)
+    assert total([first, second]).to_dict() == {
+        "stream": "total",
+        "units": 2,
+        "requests": 3,
+        "rows": 6010,
+        "bytes": 0,
+        "seconds": 3.0,
+        "suggested_window_days": None,
+    }
+
+
+def test_detail_fan_out_counts_a_partial_batch_by_its_transactions():
+    tap = TapRestaurant365(
+        config={"username": "u", "password": "p", "store_name": "s"}, parse_env_config=False
+    )
+    details = tap.streams["transaction_detail"]
+    # The 3 sampled transactions have 3 detail rows each.
+    details.probe_units = lambda units: [Probe(9, {"transactionDetailId": "d"}, 0.2)]
+    transactions = [Probe(1, {"transactionId": f"t{i}"}, 0.1) for i in range(3)]
+    result = details.estimate_fan_out(transactions)
+    assert (result.requests, result.rows) == (1, 9)
+
+    # 25 transactions fill two requests and part of a third.
+    transactions += [Probe(22, None, 0.1)]
+    result = details.estimate_fan_out(transactions)
+    assert (result.requests, result.rows) == (3, 75)
@@ -0,0 +1,40 @@
+"""Tests for background page prefetching."""
+
+import threading
+import time
+
+import pytest
+
+from tap_restaurant365.prefetch import prefetch
+
+
+def test_items_arrive_in_order_and_producer_stays_bounded():
+    produced = []
+
+    def pages():
+        for page in range(10):
+            produced.append(page)
+            yield page
+
+    items = prefetch(pages(), depth=2)
+    assert next(items) == 0
+    time.sleep(0.2)
+    # One item taken, two buffered and one waiting to be put.
+    assert len(produced) <= 4
+    assert list(items) == list(range(1, 10))
+
+
+def test_producer_errors_are_raised_and_close_stops_the_producer():
+    def failing():
+        yield 1
+        raise RuntimeError("page failed")
+
+    items = prefetch(failing(), depth=1)
+    assert next(items) == 1
+    with pytest.raises(RuntimeError):
+        next(items)
+
+    items = prefetch(iter(range(1000)), depth=1, name="closed")
+    next(items)
+    items.close()
+    assert not any(thread.name == "closed" for thread in threading.enumerate())
@@ -0,0 +1,55 @@
+"""Tests for the concurrent request engine."""
+
+import threading
+import time
+
+from tap_restaurant365.request_engine import RequestEngine
+
+
+class FakeStream:
+    name = "fake"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.sent = 0
+
+    def request_decorator(self, func):
+        return func
+
+    def prepare_request(self, context, next_page_token):
+        return next_page_token
+
+    def update_sync_costs(self, request, response, context):
+        pass
+
+    def _request(self, token, context):
+        with self.lock:
+            self.running += 1
+            self.sent += 1
+            self.max_running = max(self.max_running, self.running)
+        # Later units answer first.
+        time.sleep(0.02 * (5 - token % 5))
+        with self.lock:
+            self.running -= 1
+        return token
+
+
+def test_responses_are_delivered_in_plan_order():
+    stream = FakeStream()
+    with RequestEngine(stream, max_in_flight=4) as engine:
+        tokens = [token for _, token, _ in engine.fetch_ordered((None, i) for i in range(10))]
+    assert tokens == list(range(10))
+    assert 1 < stream.max_running <= 4
+
+
+def test_requests_wait_for_the_consumer():
+    stream = FakeStream()
+    with RequestEngine(stream, max_in_flight=3) as engine:
+        responses = engine.fetch_ordered((None, i) for i in range(10))
+        assert next(responses)[2] == 0
+        time.sleep(0.2)
+        # The first response plus up to max_in_flight requests ahead of the consumer.
+        assert stream.sent <= 4
+        responses.close()
@@ -0,0 +1,16 @@
+"""Tests for the transaction rowVersion index."""
+
+from tap_restaurant365.row_version_index import RowVersionIndex
+
+
+def test_index_tracks_latest_synced_version(tmp_path):
+    index = RowVersionIndex(str(tmp_path / "index.sqlite"))
+    index.update({"a": 5, "b": None})
+    assert index.is_synced("a", 5)
+    assert not index.is_synced("a", 6)
+    assert not index.is_synced("b", 1)
+    index.update({"a": 6})
+    index.close()
+
+    reopened = RowVersionIndex(str(tmp_path / "index.sqlite"))
+    assert reopened.get("a") == 6
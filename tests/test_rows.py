@@ -0,0 +1,27 @@
+"""Tests for compact in-flight rows."""
+
+import json
+
+from tap_restaurant365.rows import as_dict, row_class
+
+
+def test_rows_decode_compactly_and_convert_back_to_dicts():
+    Row = row_class("SalesRow", ["id", "amount", "modifiedOn"])
+    page = json.loads(
+        '{"value": [{"amount": 1.5, "id": "a", "extra": true}, {"id": "b"}]}',
+        object_pairs_hook=Row.from_pairs,
+    )
+    first, second = page["value"]
+    assert type(page) is dict and isinstance(first, Row)
+    assert first["id"] == "a" and first.get("modifiedOn") is None
+    assert "modifiedOn" not in second and len(second) == 1
+    assert as_dict(first) == {"id": "a", "amount": 1.5, "extra": True}
+    assert list(as_dict(first)) == ["id", "amount", "extra"]
+
+
+def test_rows_support_updates():
+    row = row_class("Row", ["id"]).from_pairs([("id", "a")])
+    row["id"] = "b"
+    row["partition"] = 1
+    del row["id"]
+    assert as_dict(row) == {"partition": 1}
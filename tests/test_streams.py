@@ -0,0 +1,454 @@
+"""Tests for stream pagination and state, against a fake API."""
+
+import json
+import re
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlparse
+
+import backoff
+import requests
+from dateutil import parser
+
+from tap_restaurant365 import client
+from tap_restaurant365.latency import LatencyTracker
+from tap_restaurant365.odata import COMPARISON_NODES, DEFAULT_NODE_LIMIT
+
+from tap_restaurant365.tap import TapRestaurant365
+
+CONFIG = {"username": "u", "password": "p", "store_name": "s"}
+
+
+def make_tap(state=None, **config):
+    return TapRestaurant365(
+        config={**CONFIG, **config}, state=state or {}, parse_env_config=False
+    )
+
+
+def fake_api(stream, respond):
+    """Answer the stream's requests with ``respond(params)``, returning the params sent."""
+    sent = []
+
+    def _request(prepared_request, context):
+        query = parse_qs(urlparse(prepared_request.url).query)
+        params = {key: values[0] for key, values in query.items()}
+        sent.append(params)
+        response = requests.Response()
+        response.status_code = 200
+        response.request = prepared_request
+        response._content = json.dumps(respond(params)).encode()
+        return response
+
+    stream._request = _request
+    return sent
+
+
+def payroll_row(end):
+    return {"employeeID": "e", "payrollStart": "2024-01-01T00:00:00", "payrollEnd": end}
+
+
+def test_payroll_window_pages_keep_the_window_filter(capsys):
+    tap = make_tap(start_date="2024-01-01T00:00:00Z")
+    stream = tap.streams["payroll_summary"]
+
+    def respond(params):
+        if len(sent) == 1:
+            # The first window holds more than a page of rows.
+            return {
+                "value": [payroll_row("2024-01-05T00:00:00")],
+                "@odata.nextLink": "https://odata/PayrollSummary?$skip=5000",
+            }
+        if params.get("$skip") == "5000":
+            return {"value": [payroll_row("2024-01-06T00:00:00")]}
+        return {"value": []}
+
+    sent = fake_api(stream, respond)
+    stream.sync()
+    capsys.readouterr()
+
+    assert sent[1]["$skip"] == "5000"
+    assert sent[1]["$filter"] == sent[0]["$filter"]
+    assert all("$filter" in params for params in sent)
+
+
+def full_table_catalog(stream_name):
+    """Return the tap's catalog with ``stream_name`` selected as FULL_TABLE."""
+    catalog = make_tap().catalog_dict
+    for entry in catalog["streams"]:
+        if entry["tap_stream_id"] != stream_name:
+            continue
+        entry["replication_key"] = None
+        entry["replication_method"] = "FULL_TABLE"
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == []:
+                metadata["metadata"].update(
+                    {"replication-key": None, "replication-method": "FULL_TABLE", "selected": True}
+                )
+    return catalog
+
+
+def test_full_table_payroll_windows_stay_filtered(capsys):
+    start = (datetime.utcnow() - timedelta(days=25)).strftime("%Y-%m-%dT00:00:00Z")
+    tap = TapRestaurant365(
+        config={**CONFIG, "start_date": start},
+        catalog=full_table_catalog("payroll_summary"),
+        parse_env_config=False,
+    )
+    stream = tap.streams["payroll_summary"]
+    assert stream.replication_key is None
+    sent = fake_api(stream, lambda params: {"value": [payroll_row("2024-01-05T00:00:00")]})
+    stream.sync()
+    capsys.readouterr()
+    assert len(sent) > 1
+    assert all(
+        " ge " in params["$filter"] and " lt " in params["$filter"] for params in sent
+    )
+    assert all(params["$filter"].startswith("payrollEnd ge") for params in sent)
+
+
+def transaction_api(tap, fail_after_details=None):
+    """Fake a page of 10 transactions (and their details), then empty windows."""
+    details_sent = fake_api(
+        tap.streams["transaction_detail"],
+        lambda params: {"value": [{"transactionDetailId": "d", "rowType": "r"}]},
+    )
+
+    def respond(params):
+        if len(sent) == 1:
+            return {
+                "value": [
+                    {
+                        "transactionId": f"t{i}",
+                        "rowVersion": 1,
+                        "modifiedOn": "2024-01-02T00:00:00Z",
+                    }
+                    for i in range(10)
+                ]
+            }
+        if fail_after_details:
+            fail_after_details()
+        return {"value": []}
+
+    sent = fake_api(tap.streams["transaction"], respond)
+    return details_sent
+
+
+def test_row_versions_are_indexed_only_after_state(tmp_path, capsys):
+    index_path = str(tmp_path / "index.sqlite")
+    bookmark = {"replication_key": "modifiedOn", "replication_key_value": "2024-01-01T00:00:00Z"}
+    state = {"bookmarks": {"transaction": bookmark}}
+    tap = make_tap(state, start_date="2024-01-01T00:00:00Z", transaction_index_path=index_path)
+    stream = tap.streams["transaction"]
+
+    def fail():
+        # Fail the next window once the first batch of details was written.
+        while not details_sent:
+            time.sleep(0.01)
+        raise RuntimeError("target went away")
+
+    details_sent = transaction_api(tap, fail)
+    try:
+        stream.sync()
+    except RuntimeError:
+        pass
+    assert details_sent
+    assert stream.row_version_index.get("t0") is None
+
+    tap = make_tap(state, start_date="2024-01-01T00:00:00Z", transaction_index_path=index_path)
+    transaction_api(tap)
+    tap.streams["transaction"].sync()
+    capsys.readouterr()
+    assert tap.streams["transaction"].row_version_index.get("t0") == 1
+
+
+def test_replay_emits_archived_pages_and_children_without_requests(tmp_path, capsys):
+    config = {"start_date": "2024-01-01T00:00:00Z", "archive_directory": str(tmp_path)}
+    tap = make_tap(**config)
+    details_sent = transaction_api(tap)
+    tap.streams["transaction"].sync()
+    capsys.readouterr()
+    assert details_sent
+
+    tap = make_tap(**config, replay_archive=True)
+
+    def no_requests(prepared_request, context):
+        raise AssertionError(f"Replay sent a request to {prepared_request.url}")
+
+    for stream in tap.streams.values():
+        stream._request = no_requests
+    stream = tap.streams["transaction"]
+    stream.sync()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    replayed = [(m["stream"], m["record"]) for m in messages if m["type"] == "RECORD"]
+    # Details follow their parent, one archived row per detail request.
+    assert [name for name, _ in replayed] == ["transaction"] * 10 + ["transaction_detail"] * len(
+        details_sent
+    )
+    assert [record["transactionId"] for _, record in replayed[:10]] == [f"t{i}" for i in range(10)]
+
+
+def test_deletions_write_tombstones_to_selected_streams(capsys, caplog):
+    catalog = make_tap().catalog_dict
+    for entry in catalog["streams"]:
+        selected = entry["tap_stream_id"] in ("entity_deleted", "transaction")
+        for metadata in entry["metadata"]:
+            if metadata["breadcrumb"] == []:
+                metadata["metadata"]["selected"] = selected
+    tap = TapRestaurant365(
+        config={**CONFIG, "start_date": "2024-01-01T00:00:00Z", "propagate_deletes": True},
+        catalog=catalog,
+        parse_env_config=False,
+    )
+    stream = tap.streams["entity_deleted"]
+    deletions = [
+        ("t1", "Transaction"),
+        ("s1", "SalesDetail"),  # sales_detail is not selected
+        ("d1", "TransactionDetail"),
+    ]
+    fake_api(
+        stream,
+        lambda params: {
+            "value": [
+                {
+                    "entityId": entity_id,
+                    "entityName": name,
+                    "deletedOn": "2024-01-02T00:00:00Z",
+                    "rowVersion": i,
+                }
+                for i, (entity_id, name) in enumerate(deletions)
+            ]
+        },
+    )
+    stream.sync()
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    tombstones = [
+        (m["stream"], m["record"])
+        for m in messages
+        if m["type"] == "RECORD" and m["stream"] != "entity_deleted"
+    ]
+    assert tombstones == [
+        ("transaction", {"transactionId": "t1", "_sdc_deleted_at": "2024-01-02T00:00:00Z"})
+    ]
+    transaction_messages = [m["type"] for m in messages if m.get("stream") == "transaction"]
+    assert transaction_messages == ["SCHEMA", "RECORD"]
+    assert "TransactionDetail match no stream" in caplog.text
+
+
+def filter_nodes(text):
+    comparisons = len(re.findall(r" (?:eq|ne|gt|ge|lt|le) ", text))
+    return comparisons * COMPARISON_NODES + len(re.findall(r" (?:and|or) ", text))
+
+
+def test_detail_filters_fit_the_node_limit_next_to_pushed_down_filters(capsys):
+    tap = make_tap(start_date="2024-01-01T00:00:00Z")
+    for name in ("transaction", "transaction_detail"):
+        stream = tap.streams[name]
+        stream.pushdown_values = {"locationId": ["l1"]}
+        stream.query_template, stream.filter_chunks = stream.push_down_filters(
+            stream.build_query_template()
+        )
+    details_sent = transaction_api(tap)
+    tap.streams["transaction"].sync()
+    capsys.readouterr()
+    filters = [params["$filter"] for params in details_sent]
+    assert all(filter_nodes(text) <= DEFAULT_NODE_LIMIT for text in filters)
+    assert all("locationId eq 'l1'" in text for text in filters)
+    assert sum(text.count("transactionId eq") for text in filters) == 10
+
+
+def sync_messages(stream, capsys, fail=False):
+    try:
+        stream.sync()
+    except RuntimeError:
+        assert fail
+    messages = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    states = [m["value"]["bookmarks"][stream.name] for m in messages if m["type"] == "STATE"]
+    records = [m["record"] for m in messages if m["type"] == "RECORD"]
+    return states, records
+
+
+def window_start(params):
+    return parse_date(params["$filter"].split(" ge ")[1].split(" ")[0])
+
+
+def parse_date(value):
+    return parser.parse(value).replace(tzinfo=None)
+
+
+def freshness_first_sync(capsys, state=None, fail_at=None):
+    """Sync 6 days of sales_detail, the last 2 first, with a record per window."""
+    start = (datetime.utcnow() - timedelta(days=6)).strftime("%Y-%m-%dT00:00:00Z")
+    tap = make_tap(state, start_date=start, freshness_first_days=2)
+    stream = tap.streams["sales_detail"]
+
+    def respond(params):
+        if len(sent) == fail_at:
+            raise RuntimeError("interrupted")
+        modified_on = window_start(params) + timedelta(hours=1)
+        if modified_on > datetime.utcnow():
+            return {"value": []}
+        return {
+            "value": [
+                {"salesdetailID": str(modified_on), "modifiedOn": f"{modified_on:%Y-%m-%dT%H:%M:%SZ}"}
+            ]
+        }
+
+    sent = fake_api(stream, respond)
+    states, records = sync_messages(stream, capsys, fail=fail_at is not None)
+    return [window_start(params) for params in sent], states, records
+
+
+def assert_bookmark_never_moves_back(states, records):
+    values = [parse_date(state["replication_key_value"]) for state in states]
+    assert values == sorted(values)
+    assert values[-1] == max(parse_date(record["modifiedOn"]) for record in records)
+
+
+def test_freshness_first_resumes_an_interrupted_head(capsys):
+    requested, states, records = freshness_first_sync(capsys, fail_at=3)
+    backfill = states[-1]["backfill"]
+    # The tail was not started, the head resumes after its last record.
+    assert all(state["backfill"] == backfill for state in states)
+    resumed, more_states, more_records = freshness_first_sync(
+        capsys, {"bookmarks": {"sales_detail": states[-1]}}
+    )
+    bookmark = parse_date(states[-1]["replication_key_value"])
+    assert resumed[0] == bookmark + timedelta(seconds=1)
+    assert parse_date(backfill["start"]) in resumed
+    assert "backfill" not in more_states[-1]
+    assert_bookmark_never_moves_back(states + more_states, records + more_records)
+
+
+def test_freshness_first_resumes_an_interrupted_tail(capsys):
+    requested, states, records = freshness_first_sync(capsys, fail_at=8)
+    backfill = states[-1]["backfill"]
+    # The tail cursor points at the interrupted window.
+    assert parse_date(backfill["start"]) == requested[-1]
+    resumed, more_states, more_records = freshness_first_sync(
+        capsys, {"bookmarks": {"sales_detail": states[-1]}}
+    )
+    tail = [start for start in resumed if start < parse_date(backfill["end"])]
+    assert tail[0] == requested[-1]
+    assert "backfill" not in more_states[-1]
+    assert_bookmark_never_moves_back(states + more_states, records + more_records)
+
+
+def test_page_checkpoints_resume_inclusively_and_clear_on_completion(capsys):
+    tap = make_tap(start_date="2024-01-01T00:00:00Z")
+    stream = tap.streams["accounts"]
+    pages = [
+        # The server pages at 2 rows, not 5000.
+        (["2024-01-02T00:00:00Z", "2024-01-02T00:00:00Z"], 2),
+        (["2024-01-03T00:00:00Z"], 3),
+    ]
+
+    def respond(params):
+        if len(sent) > len(pages):
+            raise RuntimeError("interrupted")
+        modified, skip = pages[len(sent) - 1]
+        return {
+            "value": [{"glAccountId": f"a{i}", "modifiedOn": value} for i, value in enumerate(modified)],
+            "@odata.nextLink": f"https://odata/GLAccount?$skip={skip}",
+        }
+
+    sent = fake_api(stream, respond)
+    states, _ = sync_messages(stream, capsys, fail=True)
+    assert [params.get("$skip") for params in sent] == [None, "2", "3"]
+    assert [state["checkpoint"] for state in states] == [
+        "2024-01-02T00:00:00Z",
+        "2024-01-03T00:00:00Z",
+    ]
+
+    tap = make_tap({"bookmarks": {"accounts": states[-1]}}, start_date="2024-01-01T00:00:00Z")
+    stream = tap.streams["accounts"]
+    resumed = fake_api(
+        stream,
+        lambda params: {"value": [{"glAccountId": "a9", "modifiedOn": "2024-01-03T00:00:00Z"}]},
+    )
+    states, _ = sync_messages(stream, capsys)
+    # Rows sharing the checkpoint's timestamp may not all have been synced.
+    assert "ge 2024-01-03T00:00:00Z" in resumed[0]["$filter"]
+    assert "checkpoint" not in states[-1]
+    assert states[-1]["replication_key_value"] == "2024-01-03T00:00:00Z"
+
+
+def test_timed_out_requests_are_retried_with_the_full_timeout(monkeypatch):
+    monkeypatch.setattr(client, "latency_tracker", LatencyTracker(min_samples=1))
+    tap = make_tap(adaptive_timeouts=True)
+    stream = tap.streams["accounts"]
+    client.latency_tracker.record(stream.path, 0.5)
+    monkeypatch.setattr(stream, "backoff_wait_generator", lambda: backoff.constant(interval=0))
+    timeouts = []
+
+    def send(prepared_request, timeout):
+        timeouts.append(timeout)
+        if len(timeouts) == 1:
+            raise requests.exceptions.ReadTimeout()
+        response = requests.Response()
+        response.status_code = 200
+        response._content = b'{"value": []}'
+        return response
+
+    monkeypatch.setattr(stream.requests_session, "send", send)
+    request = requests.Request("GET", stream.url_base + stream.path).prepare()
+    stream.request_decorator(stream._request)(request, None)
+    assert timeouts == [client.MIN_TIMEOUT, stream.max_timeout]
+    # The timed out request counts as a sample, which raises the endpoint's p99.
+    assert stream.timeout > client.MIN_TIMEOUT
+
+
+def test_hedging_waits_for_the_usual_full_request_time(monkeypatch):
+    monkeypatch.setattr(client, "latency_tracker", LatencyTracker(min_samples=1))
+    monkeypatch.setattr(client, "duration_tracker", LatencyTracker(min_samples=1))
+    tap = make_tap(hedge_requests=True)
+    stream = tap.streams["accounts"]
+    # Headers arrive at once, but reading a page takes a second.
+    client.latency_tracker.record(stream.path, 0.01)
+    client.duration_tracker.record(stream.path, 1.0)
+    sent = []
+
+    def send(prepared_request, timeout):
+        sent.append(prepared_request)
+        time.sleep(0.1)
+        response = requests.Response()
+        response.status_code = 200
+        response.elapsed = timedelta(seconds=0.01)
+        response._content = b'{"value": []}'
+        return response
+
+    monkeypatch.setattr(stream.requests_session, "send", send)
+    request = requests.Request("GET", stream.url_base + stream.path).prepare()
+    stream._request(request, None)
+    assert len(sent) == 1
+    executor = stream._hedge_executor
+    fake_api(stream, lambda params: {"value": []})
+    stream.sync()
+    assert executor._shutdown and stream._hedge_executor is None
+
+
+class CountingResponse(requests.Response):
+    """Response counting how often its body is read."""
+
+    reads = 0
+
+    @property
+    def content(self):
+        self.reads += 1
+        return super().content
+
+
+def test_pages_are_decoded_once_whichever_reads_them_first():
+    stream = make_tap().streams["sales_detail"]
+    body = json.dumps(
+        {"value": [{"salesdetailID": "s1"}], "@odata.nextLink": "https://odata/SalesDetail?$skip=5000"}
+    ).encode()
+    for token_first in (False, True):
+        stream.skip = 0
+        response = CountingResponse()
+        response._content = body
+        if token_first:
+            assert stream.get_next_page_token(response, None)["skip"] == 5000
+        assert [row["salesdetailID"] for row in stream.parse_response(response)] == ["s1"]
+        if not token_first:
+            assert stream.get_next_page_token(response, None)["skip"] == 5000
+        assert response.reads == 1